@@ -0,0 +1,361 @@
+"""Query backends the dashboard reads the catalog through.
+
+Every backend answers the same questions for a filter state: matching row
+ids, projected/sorted/limited rows, grouped aggregates, correlations, the
+CSV export and whole-catalog summary figures. Rows always come back indexed
+by ``row_id``, the product's position in the snapshot, in ascending order
+unless a sort is requested (ties keep ``row_id`` order).
+
+* ``pandas`` keeps the snapshot in one in-memory DataFrame.
+* ``duckdb`` runs vectorized, multi-threaded SQL directly over the Parquet
+  snapshot, so only the projected result of each query reaches pandas.
+
+Pick one with the ``QUERY_BACKEND`` environment variable. ``tests/test_backends.py``
+checks the backends against each other on a synthetic snapshot; running this
+module does the same on a built snapshot:
+
+    python backends.py [--out snapshot]
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import ingest
+from result_cache import canonical_state
+
+QUALITY_COLUMNS = ['product_name', 'category', 'discounted_price', 'rating', 'discount_percentage', 'rating_count']
+
+
+class PandasBackend:
+    def __init__(self, df, id_cache=None, memo_size=32):
+        self.df = df.rename_axis('row_id')
+        self.columns = list(self.df.columns)
+        # Optional hook(state, compute) that can persist filtered ids across restarts
+        self.id_cache = id_cache
+        self._memo = OrderedDict()
+        self._memo_size = memo_size
+        self._lock = threading.Lock()
+
+    def _select_ids(self, state):
+        df = self.df
+        mask = (
+            df['category'].isin(state['categories']) &
+            (df['rating'] >= state['min_rating']) & (df['rating'] <= state['max_rating']) &
+            (df['discount_percentage'] >= state['min_discount']) &
+            (df['rating_count'] >= state['min_reviews'])
+        )
+        if state['price_range']:
+            mask &= df['discounted_price'].between(*state['price_range'], inclusive='left')
+        if state['signals']:
+            mask &= (df[list(state['signals'])] > 0).any(axis=1)
+        if state['search_term']:
+            mask &= df['product_name'].str.contains(state['search_term'], case=False, na=False)
+        return df.index[mask].to_numpy()
+
+    def filter_ids(self, state):
+        key = json.dumps(canonical_state(state), sort_keys=True, default=float)
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+
+        compute = lambda: self._select_ids(state)
+        ids = self.id_cache(state, compute) if self.id_cache else compute()
+
+        with self._lock:
+            self._memo[key] = ids
+            if len(self._memo) > self._memo_size:
+                self._memo.popitem(last=False)
+        return ids
+
+    def select(self, state, columns, order_by=None, ascending=False, limit=None):
+        projection = list(dict.fromkeys(columns + ([order_by] if order_by else [])))
+        rows = self.df.loc[self.filter_ids(state), projection]
+        if order_by:
+            rows = rows.sort_values(order_by, ascending=ascending, kind='stable')
+        if limit is not None:
+            rows = rows.head(limit)
+        return rows
+
+    def aggregate(self, state, measures, by=None):
+        """``measures`` maps output name to ``(column, func)``; func is sum, mean,
+        min, max, count or positive (number of rows with the column above 0)."""
+        rows = self.df.loc[self.filter_ids(state)]
+        frame = pd.DataFrame(index=rows.index)
+        named = {}
+        for name, (column, func) in measures.items():
+            if func == 'positive':
+                frame[name] = rows[column] > 0
+                named[name] = (name, 'sum')
+            else:
+                frame[name] = rows[column]
+                named[name] = (name, func)
+        if by:
+            frame[by] = rows[by]
+            return frame.groupby(by).agg(**named)
+        return pd.DataFrame({name: [getattr(frame[col], func)()] for name, (col, func) in named.items()})
+
+    def correlation(self, state, columns):
+        return self.df.loc[self.filter_ids(state), columns].corr()
+
+    def export_csv(self, state):
+        return self.df.loc[self.filter_ids(state)].to_csv(index=False).encode('utf-8')
+
+    def summary(self):
+        df = self.df
+        return {
+            'rows': len(df),
+            'categories': sorted(df['category'].unique()),
+            'rating_min': float(df['rating'].min()),
+            'rating_max': float(df['rating'].max()),
+            'discount_min': float(df['discount_percentage'].min()),
+            'discount_max': float(df['discount_percentage'].max()),
+            'reviews_max': int(df['rating_count'].max()),
+            'price_min': float(df['discounted_price'].min()),
+            'price_max': float(df['discounted_price'].max()),
+            'completeness': {col: df[col].notna().sum() / len(df) * 100 for col in QUALITY_COLUMNS},
+            'zero_discounts': int((df['discount_percentage'] == 0).sum()),
+            'no_reviews': int((df['rating_count'] == 0).sum()),
+            'extreme_discounts': int((df['discount_percentage'] > 80).sum()),
+        }
+
+
+AGGREGATE_SQL = {
+    'sum': 'COALESCE(SUM({}), 0)',
+    'mean': 'AVG({})',
+    'min': 'MIN({})',
+    'max': 'MAX({})',
+    'count': 'COUNT({})',
+    'positive': 'COALESCE(COUNT_IF({} > 0), 0)',
+}
+
+
+class DuckDBBackend:
+    # Filtered ids are never persisted; DuckDB recomputes them from the Parquet scan
+    id_cache = None
+
+    def __init__(self, parquet_path):
+        import duckdb
+
+        self._conn = duckdb.connect()
+        self._conn.execute(
+            "CREATE VIEW catalog AS SELECT * FROM read_parquet('{}')".format(parquet_path.replace("'", "''"))
+        )
+        names = [row[0] for row in self._conn.execute("DESCRIBE catalog").fetchall()]
+        self.columns = [name for name in names if name != 'row_id']
+        self._known = set(names)
+
+    def _query(self, sql, params=()):
+        # A cursor per query keeps concurrent Streamlit sessions off each other's connection state
+        return self._conn.cursor().execute(sql, list(params)).df()
+
+    def _column(self, name):
+        if name not in self._known:
+            raise KeyError(f"Unknown column: {name}")
+        return '"{}"'.format(name)
+
+    def _where(self, state):
+        categories = list(state['categories'])
+        if not categories:
+            return 'FALSE', []
+        clauses = [
+            'category IN ({})'.format(', '.join('?' * len(categories))),
+            'rating BETWEEN ? AND ?',
+            'discount_percentage >= ?',
+            'rating_count >= ?',
+        ]
+        params = categories + [state['min_rating'], state['max_rating'], state['min_discount'], state['min_reviews']]
+        if state['price_range']:
+            clauses.append('discounted_price >= ? AND discounted_price < ?')
+            params += list(state['price_range'])
+        if state['signals']:
+            clauses.append('({})'.format(' OR '.join(f'{self._column(c)} > 0' for c in state['signals'])))
+        if state['search_term']:
+            # Regex match, as pandas str.contains does
+            clauses.append("regexp_matches(product_name, ?, 'i')")
+            params.append(state['search_term'])
+        return ' AND '.join(clauses), params
+
+    def filter_ids(self, state):
+        where, params = self._where(state)
+        return self._query(f"SELECT row_id FROM catalog WHERE {where} ORDER BY row_id", params)['row_id'].to_numpy()
+
+    def select(self, state, columns, order_by=None, ascending=False, limit=None):
+        where, params = self._where(state)
+        projection = list(dict.fromkeys(['row_id'] + columns + ([order_by] if order_by else [])))
+        sql = "SELECT {} FROM catalog WHERE {}".format(', '.join(self._column(c) for c in projection), where)
+        if order_by:
+            sql += " ORDER BY {} {} NULLS LAST, row_id".format(self._column(order_by), 'ASC' if ascending else 'DESC')
+        else:
+            sql += " ORDER BY row_id"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self._query(sql, params).set_index('row_id')[projection[1:]]
+
+    def aggregate(self, state, measures, by=None):
+        where, params = self._where(state)
+        exprs = [
+            '{} AS "{}"'.format(AGGREGATE_SQL[func].format(self._column(column)), name.replace('"', '""'))
+            for name, (column, func) in measures.items()
+        ]
+        if by:
+            sql = "SELECT {0}, {1} FROM catalog WHERE {2} GROUP BY {0} ORDER BY {0}".format(
+                self._column(by), ', '.join(exprs), where
+            )
+            return self._query(sql, params).set_index(by)
+        return self._query("SELECT {} FROM catalog WHERE {}".format(', '.join(exprs), where), params)
+
+    def correlation(self, state, columns):
+        where, params = self._where(state)
+        pairs = [(a, b) for a in columns for b in columns]
+        exprs = ', '.join(f'corr({self._column(a)}, {self._column(b)})' for a, b in pairs)
+        values = self._conn.cursor().execute(f"SELECT {exprs} FROM catalog WHERE {where}", params).fetchone()
+        matrix = np.array([np.nan if v is None else v for v in values], dtype=float).reshape(len(columns), len(columns))
+        return pd.DataFrame(matrix, index=columns, columns=columns)
+
+    def export_csv(self, state):
+        where, params = self._where(state)
+        # DuckDB streams the result straight to CSV (COPY ... TO) without building a DataFrame
+        relation = self._conn.cursor().sql(
+            f"SELECT * EXCLUDE (row_id) FROM catalog WHERE {where} ORDER BY row_id", params=params
+        )
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, 'export.csv')
+            relation.write_csv(path, header=True)
+            with open(path, 'rb') as f:
+                return f.read()
+
+    def summary(self):
+        completeness = ', '.join(f'100 * COUNT({self._column(c)})::DOUBLE / COUNT(*)' for c in QUALITY_COLUMNS)
+        row = self._conn.cursor().execute(
+            "SELECT COUNT(*), MIN(rating), MAX(rating), MIN(discount_percentage), MAX(discount_percentage), "
+            "MAX(rating_count), MIN(discounted_price), MAX(discounted_price), "
+            "COUNT_IF(discount_percentage = 0), COUNT_IF(rating_count = 0), COUNT_IF(discount_percentage > 80), "
+            f"{completeness} FROM catalog"
+        ).fetchone()
+        categories = self._conn.cursor().execute("SELECT DISTINCT category FROM catalog ORDER BY category").fetchall()
+        return {
+            'rows': row[0],
+            'categories': [c[0] for c in categories],
+            'rating_min': float(row[1]),
+            'rating_max': float(row[2]),
+            'discount_min': float(row[3]),
+            'discount_max': float(row[4]),
+            'reviews_max': int(row[5]),
+            'price_min': float(row[6]),
+            'price_max': float(row[7]),
+            'completeness': dict(zip(QUALITY_COLUMNS, row[11:])),
+            'zero_discounts': row[8],
+            'no_reviews': row[9],
+            'extreme_discounts': row[10],
+        }
+
+
+BACKENDS = ['pandas', 'duckdb']
+
+
+def open_backend(name, out_dir=ingest.SNAPSHOT_DIR, id_cache=None):
+    if name == 'pandas':
+        return PandasBackend(ingest.load_snapshot(out_dir), id_cache=id_cache)
+    if name == 'duckdb':
+        return DuckDBBackend(os.path.join(out_dir, ingest.PARQUET_FILE))
+    raise ValueError(f"Unknown query backend {name!r}; expected one of {BACKENDS}")
+
+
+def parity_states(summary, signals):
+    """Filter states exercising every predicate, used to compare backends."""
+    base = dict(
+        categories=summary['categories'],
+        min_rating=summary['rating_min'],
+        max_rating=summary['rating_max'],
+        price_range=None,
+        search_term="",
+        min_discount=0.0,
+        min_reviews=0,
+        signals=[]
+    )
+    price_mid = (summary['price_min'] + summary['price_max']) / 2
+    return [
+        base,
+        dict(base, categories=summary['categories'][::2]),
+        dict(base, categories=[]),
+        dict(base, min_rating=4.0, max_rating=4.5),
+        dict(base, min_discount=50.0, min_reviews=100),
+        dict(base, price_range=(summary['price_min'], price_mid)),
+        dict(base, search_term="cable"),
+        dict(base, signals=signals[:2]),
+    ]
+
+
+def check_parity(reference, candidate):
+    """Compare two backends on every query type; returns a list of mismatch descriptions."""
+    failures = []
+
+    def compare(label, expected, actual):
+        try:
+            if isinstance(expected, pd.DataFrame):
+                pd.testing.assert_frame_equal(expected, actual, check_dtype=False, check_index_type=False,
+                                              check_names=False, rtol=1e-9)
+            elif isinstance(expected, np.ndarray):
+                np.testing.assert_array_equal(expected, actual)
+            else:
+                assert expected == actual, f"{expected!r} != {actual!r}"
+        except AssertionError as e:
+            failures.append(f"{label}: {e}")
+
+    def rounded(summary):
+        return dict(summary, completeness={k: round(v, 6) for k, v in summary['completeness'].items()})
+
+    summary = reference.summary()
+    compare("summary", rounded(summary), rounded(candidate.summary()))
+    signals = [c for c in reference.columns if c.startswith('signal_')]
+    columns = ['product_name', 'category', 'discounted_price', 'rating', 'discount_percentage', 'rating_count']
+    measures = {'products': ('rating', 'count'), 'avg_rating': ('rating', 'mean'), 'sales': ('discounted_price', 'sum')}
+    measures.update({s: (s, 'positive') for s in signals})
+
+    for i, state in enumerate(parity_states(summary, signals)):
+        compare(f"state {i} filter_ids", reference.filter_ids(state), candidate.filter_ids(state))
+        compare(f"state {i} select", reference.select(state, columns), candidate.select(state, columns))
+        for order_by in ['rating', 'discount_percentage', 'rating_count']:
+            for ascending in (False, True):
+                compare(f"state {i} top-k {order_by} asc={ascending}",
+                        reference.select(state, columns, order_by, ascending, limit=20),
+                        candidate.select(state, columns, order_by, ascending, limit=20))
+        compare(f"state {i} aggregate", reference.aggregate(state, measures), candidate.aggregate(state, measures))
+        compare(f"state {i} aggregate by category",
+                reference.aggregate(state, measures, by='category'),
+                candidate.aggregate(state, measures, by='category'))
+        compare(f"state {i} correlation",
+                reference.correlation(state, columns[3:]), candidate.correlation(state, columns[3:]))
+        compare(f"state {i} export",
+                pd.read_csv(io.BytesIO(reference.export_csv(state))),
+                pd.read_csv(io.BytesIO(candidate.export_csv(state))))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the query backends return identical results.")
+    parser.add_argument('--out', default=ingest.SNAPSHOT_DIR, help="snapshot directory")
+    args = parser.parse_args()
+
+    reference = open_backend('pandas', args.out)
+    failed = False
+    for name in BACKENDS[1:]:
+        failures = check_parity(reference, open_backend(name, args.out))
+        failed |= bool(failures)
+        print(f"{'✅' if not failures else '❌'} {name}: {len(failures)} mismatches against pandas")
+        for failure in failures:
+            print(f"   - {failure}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
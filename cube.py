@@ -0,0 +1,167 @@
+"""Pre-aggregated cubes over bucketed catalog dimensions.
+
+A cube is a sparse table with one row per non-empty cell holding counts,
+sums and min/max of the catalog measures. Any filter that every cell falls
+either fully inside or fully outside of is answered by summing cells, so
+aggregate cost depends on the number of cells rather than products. The same
+cell layout built from already-filtered rows serves as the fallback, so
+dashboard code reads aggregates one way regardless of where they came from.
+
+Two cubes are built. The main one covers category × rating × discount ×
+review count; the price rollup swaps discount for a coarse 1-2-5 price
+bucket so price-range filters can be answered too. The dashboard's discount,
+review-count and price sliders snap to the bucket edges. Cell counts are
+bounded by the number of buckets, not products, so they level off as the
+catalog grows.
+"""
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ['category', 'rating_bucket', 'discount_bucket', 'review_bucket']
+# discount_missing keeps products without a discount, which never match the discount
+# filter, out of the cells the default view sums
+PRICE_DIMENSIONS = ['category', 'rating_bucket', 'review_bucket', 'price_bucket', 'discount_missing']
+MEASURE_COLUMNS = ['rating', 'discount_percentage', 'rating_count', 'discounted_price', 'price_diff']
+
+AGGREGATES = {
+    'count': ('rating', 'size'),
+    'sum_rating': ('rating', 'sum'),
+    'min_rating': ('rating', 'min'),
+    'max_rating': ('rating', 'max'),
+    'count_discount': ('discount_percentage', 'count'),
+    'sum_discount': ('discount_percentage', 'sum'),
+    'min_discount': ('discount_percentage', 'min'),
+    'max_discount': ('discount_percentage', 'max'),
+    'sum_reviews': ('rating_count', 'sum'),
+    'min_reviews': ('rating_count', 'min'),
+    'max_reviews': ('rating_count', 'max'),
+    'count_price': ('discounted_price', 'count'),
+    'sum_price': ('discounted_price', 'sum'),
+    'min_price': ('discounted_price', 'min'),
+    'max_price': ('discounted_price', 'max'),
+    'count_savings': ('price_diff', 'count'),
+    'sum_savings': ('price_diff', 'sum'),
+}
+
+HIGH_RATING_BUCKET = 40  # rating >= 4.0
+DISCOUNT_STEP = 5
+
+PRICE_STEPS = [1, 2, 5]
+# Bucket b holds prices in [PRICE_EDGES[b], PRICE_EDGES[b + 1])
+PRICE_EDGES = np.array([0.0] + [step * 10.0 ** k for k in range(10) for step in PRICE_STEPS] + [np.inf])
+
+
+def review_edges(high):
+    """Lower edges of the review-count buckets, up to the one holding ``high``."""
+    edges = [0]
+    while edges[-1] * 2 + 1 <= high:
+        edges.append(edges[-1] * 2 + 1)
+    return edges
+
+
+def price_edges(low, high):
+    """Bucket edges from the last one at or below ``low`` to the first one above ``high``."""
+    first = np.searchsorted(PRICE_EDGES, max(low, 0), side='right') - 1
+    last = np.searchsorted(PRICE_EDGES, high, side='right')
+    return [float(edge) for edge in PRICE_EDGES[first:last + 1]]
+
+
+def bucket_columns(df):
+    price = df['discounted_price'].clip(lower=0)
+    return pd.DataFrame({
+        'category': df['category'].astype('category'),
+        # 0.1-wide rating buckets; the epsilon absorbs float error so a rating on a
+        # bucket edge never lands one bucket low
+        'rating_bucket': np.floor(df['rating'] * 10 + 1e-9).astype('int16'),
+        # 5%-wide discount buckets; -1 holds products without a discount value
+        'discount_bucket': np.floor(df['discount_percentage'] / DISCOUNT_STEP).fillna(-1).astype('int16'),
+        'discount_missing': df['discount_percentage'].isna(),
+        # log2 review-count buckets: bucket b holds counts in [2**b - 1, 2**(b + 1) - 1)
+        'review_bucket': np.floor(np.log2(df['rating_count'].clip(lower=0) + 1)).astype('int16'),
+        # -1 holds products without a price
+        'price_bucket': pd.Series(
+            np.searchsorted(PRICE_EDGES, price, side='right') - 1, index=df.index
+        ).where(price.notna(), -1).astype('int16'),
+    }, index=df.index)
+
+
+def build_cube(df, dimensions=DIMENSIONS):
+    frame = bucket_columns(df)[dimensions].join(df[MEASURE_COLUMNS])
+    return frame.groupby(dimensions, observed=True).agg(**AGGREGATES).reset_index()
+
+
+def build_price_cube(df):
+    return build_cube(df, PRICE_DIMENSIONS)
+
+
+def slice_cube(cube, categories, min_rating, max_rating, price_range, min_discount, min_reviews):
+    """Cells matching the filters, or None if any cell straddles a filter bound."""
+    cells = cube[cube['category'].isin(categories)]
+
+    bounds = [('rating', min_rating, max_rating), ('discount', min_discount, np.inf), ('reviews', min_reviews, np.inf)]
+
+    inside = pd.Series(True, index=cells.index)
+    outside = pd.Series(False, index=cells.index)
+    for name, low, high in bounds:
+        lowest, highest = cells['min_' + name], cells['max_' + name]
+        inside &= (lowest >= low) & (highest <= high)
+        outside |= (highest < low) | (lowest > high)
+
+    # The row filter on discount never matches a missing discount, so neither does the cube
+    inside &= cells['count_discount'] == cells['count']
+    outside |= cells['count_discount'] == 0
+
+    if price_range:
+        # Price ranges are half-open, and products without a price never match one
+        low, high = price_range
+        inside &= (cells['min_price'] >= low) & (cells['max_price'] < high)
+        outside |= (cells['max_price'] < low) | (cells['min_price'] >= high) | (cells['count_price'] == 0)
+
+    if not (inside | outside).all():
+        return None
+    return cells[inside]
+
+
+def totals(cells):
+    count = cells['count'].sum()
+    return {
+        'total_products': int(count),
+        'avg_rating': cells['sum_rating'].sum() / count,
+        'avg_discount': cells['sum_discount'].sum() / cells['count_discount'].sum(),
+        'total_reviews': int(cells['sum_reviews'].sum()),
+        'max_discount': cells['max_discount'].max(),
+        'avg_price': cells['sum_price'].sum() / cells['count_price'].sum(),
+        'total_sales': cells['sum_price'].sum(),
+        'avg_savings': cells['sum_savings'].sum() / cells['count_savings'].sum(),
+    }
+
+
+def by_category(cells):
+    """Per-category product count, total sales and mean rating, discount and review count."""
+    sums = cells.groupby('category', observed=True)[
+        ['count', 'sum_rating', 'count_discount', 'sum_discount', 'sum_reviews', 'sum_price']
+    ].sum()
+    sums.index = sums.index.astype(str)
+    return pd.DataFrame({
+        'count': sums['count'],
+        'rating': sums['sum_rating'] / sums['count'],
+        'discount_percentage': sums['sum_discount'] / sums['count_discount'],
+        'rating_count': sums['sum_reviews'] / sums['count'],
+        'total_sales': sums['sum_price'],
+    })
+
+
+def high_rated_count(cells):
+    return int(cells.loc[cells['rating_bucket'] >= HIGH_RATING_BUCKET, 'count'].sum())
+
+
+def rating_distribution(cells):
+    counts = cells.groupby('rating_bucket')['count'].sum().reset_index()
+    return pd.DataFrame({'rating': counts['rating_bucket'] / 10, 'count': counts['count']})
+
+
+def review_distribution(cells):
+    """Product counts per log review-count bucket, excluding products without reviews."""
+    counts = cells[cells['review_bucket'] > 0].groupby('review_bucket')['count'].sum().reset_index()
+    # Geometric midpoint of each bucket's review-count range
+    return pd.DataFrame({'rating_count': 2.0 ** (counts['review_bucket'] + 0.5) - 1, 'count': counts['count']})
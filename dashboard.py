@@ -2,8 +2,24 @@ import pandas as pd
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 import numpy as np
+import math
 import os
+from functools import partial
+import subprocess
+import sys
+
+import backends
+import cube
+import ingest
+from result_cache import ResultCache
+from sketches import HyperLogLog, KLLSketch, merge_sketches
+from text_signals import signal_columns, signal_label
+
+# Query backend: "pandas" (in-memory DataFrame) or "duckdb" (SQL over the Parquet snapshot)
+QUERY_BACKEND = os.environ.get("QUERY_BACKEND", "pandas")
+INGEST_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ingest.py")
 
 # Page setup with custom theme
 st.set_page_config(
@@ -147,35 +163,201 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 @st.cache_data
-def load_data():
+def prepare_snapshot():
     file_path = r"amazon.csv"
-    if not os.path.exists(file_path):
+    if not os.path.exists(file_path) and ingest.snapshot_is_stale(file_path):
         st.error(f"📁 File not found: {file_path}")
         st.info("💡 Please ensure the CSV file exists at the specified path.")
         st.stop()
     
     try:
-        df = pd.read_csv(file_path)
-        df.columns = df.columns.str.strip()
-        
-        # Data cleaning with progress indicator
-        with st.spinner('🔄 Processing data...'):
-            df['rating'] = pd.to_numeric(df['rating'], errors='coerce')
-            df = df.dropna(subset=['rating'])
-            df['discount_percentage'] = df['discount_percentage'].astype(str).str.replace('%', '', regex=False)
-            df['discount_percentage'] = pd.to_numeric(df['discount_percentage'], errors='coerce')
-            df['rating_count'] = pd.to_numeric(df['rating_count'], errors='coerce')
-            df['rating_count'].fillna(0, inplace=True)
-            df['category'] = df['category'].astype(str)
-            df['product_name'] = df['product_name'].astype(str)
-            
-        return df
+        if ingest.snapshot_is_stale(file_path):
+            # Ingestion runs in a child process so review text never enters this worker;
+            # keywords and distinct-count mode carry over from the previous snapshot
+            with st.spinner('🔄 Processing data...'):
+                subprocess.run([sys.executable, INGEST_SCRIPT, "--csv", file_path, "--reuse-settings"], check=True)
+        
+        return ingest.load_manifest()['fingerprint']
     except Exception as e:
         st.error(f"❌ Error loading data: {str(e)}")
         st.stop()
 
+@st.cache_resource
+def load_sketches():
+    return ingest.load_sketches()
+
+@st.cache_data
+def price_quantiles(categories):
+    # Merge the precomputed per-category sketches instead of sorting filtered prices
+    price_sketches = load_sketches()['price']
+    merged = merge_sketches((price_sketches[c] for c in categories if c in price_sketches), KLLSketch)
+    lowest, p25, median, p75, p90, highest = merged.quantiles([0, 0.25, 0.5, 0.75, 0.9, 1])
+    return {'n': merged.n, 'min': lowest, 'p25': p25, 'median': median, 'p75': p75, 'p90': p90, 'max': highest}
+
+@st.cache_data
+def distinct_counts(categories):
+    sketches = load_sketches()
+    distinct = partial(HyperLogLog, exact=sketches['distinct_exact'])
+    return {
+        name: merge_sketches((sketches[name][c] for c in categories if c in sketches[name]), distinct).cardinality()
+        for name in ('products', 'reviewers')
+    }
+
+@st.cache_resource
+def load_cube():
+    return ingest.load_cube()
+
+@st.cache_resource
+def load_price_cube():
+    return ingest.load_price_cube()
+
+@st.cache_resource
+def open_result_cache():
+    # Lives next to the snapshot by default so it survives restarts and redeploys
+    path = os.environ.get("RESULT_CACHE_PATH", os.path.join(ingest.SNAPSHOT_DIR, "results.sqlite"))
+    max_mb = int(os.environ.get("RESULT_CACHE_MB", "256"))
+    return ResultCache(path, max_bytes=max_mb * 1024 * 1024)
+
+def price_slider_options(price_stats):
+    # Snapped to the price rollup's bucket edges so price filters are answered from it
+    if price_stats['n'] and price_stats['max'] > price_stats['min']:
+        return cube.price_edges(price_stats['min'], price_stats['max'])
+    return None
+
+def format_price(value):
+    # Categories without any parsable price have no average or median
+    return "—" if pd.isna(value) else f"₹{value:,.0f}"
+
+def narrowed_price_range(price_range, price_options):
+    # The full slider range applies no filter, so products without a price stay in view
+    return None if price_range == (price_options[0], price_options[-1]) else price_range
+
+@st.cache_resource
+def load_backend(fingerprint):
+    # The pandas backend persists filtered row ids through the disk cache
+    id_cache = partial(result_cache.get_or_compute, fingerprint, 'filter_ids')
+    return backends.open_backend(QUERY_BACKEND, id_cache=id_cache)
+
 # Load data
-df = load_data()
+dataset_fingerprint = prepare_snapshot()
+result_cache = open_result_cache()
+backend = load_backend(dataset_fingerprint)
+review_signals = signal_columns(backend)
+
+@st.cache_data
+def catalog_summary(fingerprint):
+    return backend.summary()
+
+# Apply all filters; entries are bounded so memory doesn't grow with every filter state seen
+@st.cache_data(max_entries=64)
+def fetch_rows(columns, order_by=None, ascending=False, limit=None, **state):
+    return backend.select(state, columns, order_by, ascending, limit)
+
+@st.cache_data(max_entries=32)
+def aggregate_rows(measures, by=None, **state):
+    return backend.aggregate(state, measures, by)
+
+@st.cache_data(max_entries=64)
+def correlations(**state):
+    return backend.correlation(state, ['rating', 'discount_percentage', 'rating_count'])
+
+@st.cache_data(max_entries=4)
+def export_csv(**state):
+    return backend.export_csv(state)
+
+summary = catalog_summary(dataset_fingerprint)
+
+@st.cache_data(max_entries=32)
+def aggregate_cells(**state):
+    # Bucket-aligned filters are answered from a cube (the price rollup when a price
+    # range is set); search and signal filters need the rows
+    cells = None
+    if not state['search_term'] and not state['signals']:
+        rollup = load_price_cube() if state['price_range'] else load_cube()
+        cells = cube.slice_cube(
+            rollup, state['categories'], state['min_rating'], state['max_rating'],
+            state['price_range'], state['min_discount'], state['min_reviews']
+        )
+    if cells is None:
+        cells = cube.build_cube(fetch_rows(['category'] + cube.MEASURE_COLUMNS, **state))
+    return cells
+
+def category_figures(cells):
+    category_stats = cube.by_category(cells)
+    category_counts = category_stats['count'].nlargest(10).reset_index()
+    category_counts.columns = ['category', 'count']
+    
+    fig_pie = px.pie(
+        category_counts, 
+        names='category', 
+        values='count', 
+        title="🧩 Product Distribution by Category",
+        color_discrete_sequence=px.colors.qualitative.Set3,
+        hole=0.4
+    )
+    fig_pie.update_traces(textposition='inside', textinfo='percent+label')
+    fig_pie.update_layout(
+        showlegend=True,
+        height=400,
+        font_size=12,
+        title_font_size=16,
+        margin=dict(t=50, b=20, l=20, r=20)
+    )
+    
+    category_rating = category_stats['rating'].sort_values(ascending=False).head(10).reset_index()
+    
+    fig_bar = px.bar(
+        category_rating,
+        x='rating',
+        y='category',
+        orientation='h',
+        title="⭐ Average Rating by Category",
+        color='rating',
+        color_continuous_scale='RdYlGn',
+        text='rating'
+    )
+    fig_bar.update_traces(texttemplate='%{text:.2f}', textposition='inside')
+    fig_bar.update_layout(
+        height=400,
+        yaxis={'categoryorder':'total ascending'},
+        title_font_size=16,
+        margin=dict(t=50, b=20, l=20, r=20)
+    )
+    return fig_pie, fig_bar
+
+def persisted_results(state, cells):
+    kpis = result_cache.get_or_compute(dataset_fingerprint, 'kpis', state, lambda: cube.totals(cells))
+    figures = result_cache.get_or_compute(
+        dataset_fingerprint, 'category_figures', state,
+        lambda: [fig.to_json() for fig in category_figures(cells)]
+    )
+    return kpis, figures
+
+def default_filter_state():
+    return dict(
+        categories=summary['categories'],
+        min_rating=summary['rating_min'],
+        max_rating=summary['rating_max'],
+        price_range=None,
+        search_term="",
+        min_discount=0.0,
+        min_reviews=0,
+        signals=[]
+    )
+
+@st.cache_resource
+def prewarm_result_cache(fingerprint, n_popular=10):
+    # Runs once per process: fills the disk cache for the default view and the most-used filter states
+    states = [default_filter_state()] + result_cache.popular_states(limit=n_popular, fingerprint=fingerprint)
+    for state in states:
+        if backend.id_cache:
+            backend.filter_ids(state)
+        warm_cells = aggregate_cells(**state)
+        if not warm_cells.empty:
+            persisted_results(state, warm_cells)
+    return len(states)
+
+prewarm_result_cache(dataset_fingerprint)
 
 # Enhanced Sidebar
 with st.sidebar:
@@ -190,8 +372,8 @@ with st.sidebar:
     with st.expander("📊 Category & Rating", expanded=True):
         categories = st.multiselect(
             "🏷️ Select Categories", 
-            options=sorted(df['category'].unique()), 
-            default=sorted(df['category'].unique()),
+            options=summary['categories'], 
+            default=summary['categories'],
             help="Choose one or more categories to analyze"
         )
         
@@ -199,19 +381,38 @@ with st.sidebar:
         with col1:
             min_rating = st.number_input(
                 "⭐ Min Rating", 
-                min_value=float(df['rating'].min()),
-                max_value=float(df['rating'].max()),
-                value=float(df['rating'].min()),
+                min_value=summary['rating_min'],
+                max_value=summary['rating_max'],
+                value=summary['rating_min'],
                 step=0.1
             )
         with col2:
             max_rating = st.number_input(
                 "⭐ Max Rating", 
-                min_value=float(df['rating'].min()),
-                max_value=float(df['rating'].max()),
-                value=float(df['rating'].max()),
+                min_value=summary['rating_min'],
+                max_value=summary['rating_max'],
+                value=summary['rating_max'],
                 step=0.1
             )
+        
+        price_stats = price_quantiles(categories)
+        price_options = price_slider_options(price_stats)
+        if price_options:
+            price_range = st.select_slider(
+                "💰 Price Range (₹)",
+                options=price_options,
+                value=(price_options[0], price_options[-1]),
+                format_func=lambda price: f"₹{price:,.0f}",
+                help="Discounted price from the lower bound up to, not including, the upper bound; "
+                     "bounds follow the selected categories"
+            )
+            price_range = narrowed_price_range(price_range, price_options)
+            st.caption(
+                f"P25 ₹{price_stats['p25']:,.0f} · Median ₹{price_stats['median']:,.0f} · "
+                f"P75 ₹{price_stats['p75']:,.0f} · P90 ₹{price_stats['p90']:,.0f}"
+            )
+        else:
+            price_range = None
     
     # Product Search
     with st.expander("🔍 Product Search"):
@@ -223,25 +424,37 @@ with st.sidebar:
         
         # Advanced filters
         st.subheader("🎛️ Advanced Filters")
+        # Both sliders snap to the cube's bucket edges so their filters are answered from it
         min_discount = st.slider(
             "💸 Minimum Discount %", 
-            0.0, float(df['discount_percentage'].max()), 
-            0.0
+            0.0, float(math.ceil(summary['discount_max'] / cube.DISCOUNT_STEP) * cube.DISCOUNT_STEP), 
+            0.0,
+            step=float(cube.DISCOUNT_STEP)
         )
         
-        min_reviews = st.slider(
+        review_options = cube.review_edges(summary['reviews_max'])
+        min_reviews = st.select_slider(
             "👥 Minimum Reviews", 
-            0, int(df['rating_count'].max()), 
-            0,
-            step=10
+            options=review_options,
+            value=0,
+            format_func=lambda reviews: f"{reviews:,}"
+        ) if len(review_options) > 1 else 0
+    
+    # Review Signals
+    with st.expander("🚩 Review Signals"):
+        selected_signals = st.multiselect(
+            "Products whose reviews mention",
+            options=review_signals,
+            format_func=signal_label,
+            help="Keyword signals extracted from review text at ingestion"
         )
     
     # Sorting Options
     with st.expander("🔄 Sort & Display", expanded=True):
         sort_by = st.selectbox(
             "📈 Sort by", 
-            ["rating", "discount_percentage", "rating_count"],
-            format_func=lambda x: {"rating": "⭐ Rating", "discount_percentage": "💸 Discount", "rating_count": "👥 Reviews"}[x]
+            ["rating", "discount_percentage", "rating_count", "discounted_price"],
+            format_func=lambda x: {"rating": "⭐ Rating", "discount_percentage": "💸 Discount", "rating_count": "👥 Reviews", "discounted_price": "💰 Price"}[x]
         )
         sort_order = st.radio("📊 Order", ["Descending", "Ascending"])
         
@@ -252,51 +465,40 @@ with st.sidebar:
     st.markdown("### 📥 Export Data")
     
     # Filter the data for export
-    filtered_export_df = df[
-        (df['category'].isin(categories)) &
-        (df['rating'] >= min_rating) & (df['rating'] <= max_rating) &
-        (df['discount_percentage'] >= min_discount) &
-        (df['rating_count'] >= min_reviews)
-    ]
-    
-    if search_term:
-        filtered_export_df = filtered_export_df[
-            filtered_export_df['product_name'].str.contains(search_term, case=False, na=False)
-        ]
+    filter_state = dict(
+        categories=categories,
+        min_rating=min_rating,
+        max_rating=max_rating,
+        price_range=price_range,
+        search_term=search_term,
+        min_discount=min_discount,
+        min_reviews=min_reviews,
+        signals=selected_signals
+    )
+    # Count a filter state once per change, not on every rerun (tab switches, sorting, ...)
+    if st.session_state.get('last_filter_state') != filter_state:
+        st.session_state['last_filter_state'] = filter_state
+        result_cache.record_usage(dataset_fingerprint, filter_state)
     
     st.download_button(
         "⬇️ Download Filtered Data",
-        data=filtered_export_df.to_csv(index=False).encode('utf-8'),
+        data=export_csv(**filter_state),
         file_name=f"amazon_filtered_data_{pd.Timestamp.now().strftime('%Y%m%d_%H%M')}.csv",
         mime="text/csv",
         use_container_width=True
     )
 
-# Apply all filters
-@st.cache_data
-def filter_data(categories, min_rating, max_rating, search_term, min_discount, min_reviews):
-    filtered_df = df[
-        (df['category'].isin(categories)) &
-        (df['rating'] >= min_rating) & (df['rating'] <= max_rating) &
-        (df['discount_percentage'] >= min_discount) &
-        (df['rating_count'] >= min_reviews)
-    ]
-    
-    if search_term:
-        filtered_df = filtered_df[
-            filtered_df['product_name'].str.contains(search_term, case=False, na=False)
-        ]
-    
-    return filtered_df
-
-# Get filtered data
-filtered_df = filter_data(categories, min_rating, max_rating, search_term, min_discount, min_reviews)
+# Get aggregates for the filtered data
+cells = aggregate_cells(**filter_state)
 
 # Check if data is available
-if filtered_df.empty:
+if cells.empty:
     st.warning("⚠️ No products match your current filters. Please adjust your criteria.")
     st.stop()
 
+category_stats = cube.by_category(cells)
+kpis, (category_pie_json, category_bar_json) = persisted_results(filter_state, cells)
+
 # Key Performance Indicators
 st.markdown('<div class="section-header">📈 Key Performance Indicators</div>', unsafe_allow_html=True)
 
@@ -307,49 +509,102 @@ with kpi_col1:
     <div class="metric-container">
         <h4 style='color: #FF9500; margin: 0;'>📦 Total Products</h4>
         <h2 style='margin: 0.5rem 0;'>{:,}</h2>
-        <p style='color: #6c757d; margin: 0;'>Products Found</p>
+        <p style='color: #6c757d; margin: 0;'>Listings Found</p>
     </div>
-    """.format(len(filtered_df)), unsafe_allow_html=True)
+    """.format(kpis['total_products']), unsafe_allow_html=True)
 
 with kpi_col2:
-    avg_rating = filtered_df['rating'].mean()
     st.markdown("""
     <div class="metric-container">
         <h4 style='color: #28a745; margin: 0;'>⭐ Avg Rating</h4>
         <h2 style='margin: 0.5rem 0;'>{:.2f}</h2>
         <p style='color: #6c757d; margin: 0;'>Out of 5.0</p>
     </div>
-    """.format(avg_rating), unsafe_allow_html=True)
+    """.format(kpis['avg_rating']), unsafe_allow_html=True)
 
 with kpi_col3:
-    avg_discount = filtered_df['discount_percentage'].mean()
     st.markdown("""
     <div class="metric-container">
         <h4 style='color: #dc3545; margin: 0;'>💸 Avg Discount</h4>
         <h2 style='margin: 0.5rem 0;'>{:.1f}%</h2>
         <p style='color: #6c757d; margin: 0;'>Average Savings</p>
     </div>
-    """.format(avg_discount), unsafe_allow_html=True)
+    """.format(kpis['avg_discount']), unsafe_allow_html=True)
 
 with kpi_col4:
-    total_reviews = int(filtered_df['rating_count'].sum())
     st.markdown("""
     <div class="metric-container">
         <h4 style='color: #17a2b8; margin: 0;'>👥 Total Reviews</h4>
         <h2 style='margin: 0.5rem 0;'>{:,}</h2>
         <p style='color: #6c757d; margin: 0;'>Customer Reviews</p>
     </div>
-    """.format(total_reviews), unsafe_allow_html=True)
+    """.format(kpis['total_reviews']), unsafe_allow_html=True)
 
 with kpi_col5:
-    max_discount = filtered_df['discount_percentage'].max()
     st.markdown("""
     <div class="metric-container">
         <h4 style='color: #6f42c1; margin: 0;'>🏆 Max Discount</h4>
         <h2 style='margin: 0.5rem 0;'>{:.0f}%</h2>
         <p style='color: #6c757d; margin: 0;'>Best Deal</p>
     </div>
-    """.format(max_discount), unsafe_allow_html=True)
+    """.format(kpis['max_discount']), unsafe_allow_html=True)
+
+unique_col1, unique_col2, price_col1, price_col2, price_col3, price_col4 = st.columns(6)
+unique_counts = distinct_counts(categories)
+
+with unique_col1:
+    st.markdown("""
+    <div class="metric-container">
+        <h4 style='color: #FF9500; margin: 0;'>🆔 Unique Products</h4>
+        <h2 style='margin: 0.5rem 0;'>{:,}</h2>
+        <p style='color: #6c757d; margin: 0;'>Selected Categories</p>
+    </div>
+    """.format(unique_counts['products']), unsafe_allow_html=True)
+
+with unique_col2:
+    st.markdown("""
+    <div class="metric-container">
+        <h4 style='color: #6f42c1; margin: 0;'>🧑‍🤝‍🧑 Unique Reviewers</h4>
+        <h2 style='margin: 0.5rem 0;'>{:,}</h2>
+        <p style='color: #6c757d; margin: 0;'>Selected Categories</p>
+    </div>
+    """.format(unique_counts['reviewers']), unsafe_allow_html=True)
+
+with price_col1:
+    st.markdown("""
+    <div class="metric-container">
+        <h4 style='color: #FF9500; margin: 0;'>💰 Avg Price</h4>
+        <h2 style='margin: 0.5rem 0;'>{}</h2>
+        <p style='color: #6c757d; margin: 0;'>Discounted Price</p>
+    </div>
+    """.format(format_price(kpis['avg_price'])), unsafe_allow_html=True)
+
+with price_col2:
+    st.markdown("""
+    <div class="metric-container">
+        <h4 style='color: #28a745; margin: 0;'>🧾 Total Sales</h4>
+        <h2 style='margin: 0.5rem 0;'>₹{:,.0f}</h2>
+        <p style='color: #6c757d; margin: 0;'>Sum of Discounted Prices</p>
+    </div>
+    """.format(kpis['total_sales']), unsafe_allow_html=True)
+
+with price_col3:
+    st.markdown("""
+    <div class="metric-container">
+        <h4 style='color: #dc3545; margin: 0;'>🏷️ Avg Savings</h4>
+        <h2 style='margin: 0.5rem 0;'>{}</h2>
+        <p style='color: #6c757d; margin: 0;'>Actual − Discounted</p>
+    </div>
+    """.format(format_price(kpis['avg_savings'])), unsafe_allow_html=True)
+
+with price_col4:
+    st.markdown("""
+    <div class="metric-container">
+        <h4 style='color: #17a2b8; margin: 0;'>📍 Median Price</h4>
+        <h2 style='margin: 0.5rem 0;'>{}</h2>
+        <p style='color: #6c757d; margin: 0;'>Selected Categories</p>
+    </div>
+    """.format(format_price(price_stats['median'])), unsafe_allow_html=True)
 
 # Main Dashboard Content
 st.markdown('<div class="section-header">📊 Visual Analytics Dashboard</div>', unsafe_allow_html=True)
@@ -359,56 +614,20 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-    category_counts = filtered_df['category'].value_counts().head(10).reset_index()
-    category_counts.columns = ['category', 'count']
-    
-    fig_pie = px.pie(
-        category_counts, 
-        names='category', 
-        values='count', 
-        title="🧩 Product Distribution by Category",
-        color_discrete_sequence=px.colors.qualitative.Set3,
-        hole=0.4
-    )
-    fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-    fig_pie.update_layout(
-        showlegend=True,
-        height=400,
-        font_size=12,
-        title_font_size=16,
-        margin=dict(t=50, b=20, l=20, r=20)
-    )
+    fig_pie = pio.from_json(category_pie_json)
     st.plotly_chart(fig_pie, use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
 with col2:
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-    category_rating = filtered_df.groupby('category')['rating'].mean().sort_values(ascending=False).head(10).reset_index()
-    
-    fig_bar = px.bar(
-        category_rating,
-        x='rating',
-        y='category',
-        orientation='h',
-        title="⭐ Average Rating by Category",
-        color='rating',
-        color_continuous_scale='RdYlGn',
-        text='rating'
-    )
-    fig_bar.update_traces(texttemplate='%{text:.2f}', textposition='inside')
-    fig_bar.update_layout(
-        height=400,
-        yaxis={'categoryorder':'total ascending'},
-        title_font_size=16,
-        margin=dict(t=50, b=20, l=20, r=20)
-    )
+    fig_bar = pio.from_json(category_bar_json)
     st.plotly_chart(fig_bar, use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
 # Row 2: Scatter Plot Analysis
 st.markdown('<div class="chart-container">', unsafe_allow_html=True)
 fig_scatter = px.scatter(
-    filtered_df.head(1000),  # Limit points for performance
+    fetch_rows(['discount_percentage', 'rating', 'category', 'rating_count', 'product_name'], limit=1000, **filter_state),  # Limit points for performance
     x='discount_percentage',
     y='rating',
     color='category',
@@ -419,7 +638,8 @@ fig_scatter = px.scatter(
 )
 
 # Add correlation annotation
-correlation_coef = filtered_df['rating'].corr(filtered_df['discount_percentage'])
+corr_matrix = correlations(**filter_state)
+correlation_coef = corr_matrix.loc['rating', 'discount_percentage']
 fig_scatter.add_annotation(
     text=f"Correlation: {correlation_coef:.3f}",
     xref="paper", yref="paper",
@@ -442,14 +662,17 @@ st.markdown('</div>', unsafe_allow_html=True)
 # Advanced Analytics Tabs
 st.markdown('<div class="section-header">🔬 Advanced Analytics</div>', unsafe_allow_html=True)
 
-tab1, tab2, tab3, tab4 = st.tabs(["🏷️ Discount Insights", "🔗 Correlations", "📊 Distributions", "🏆 Top Performers"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["🏷️ Discount Insights", "🔗 Correlations", "📊 Distributions", "🏆 Top Performers", "🚩 Review Signals"])
 
 with tab1:
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-        top_discounted = filtered_df.nlargest(15, 'discount_percentage')
+        top_discounted = fetch_rows(
+            ['product_name', 'discount_percentage', 'rating', 'category', 'rating_count'],
+            order_by='discount_percentage', limit=15, **filter_state
+        )
         top_discounted['short_name'] = top_discounted['product_name'].apply(
             lambda x: (x[:30] + '...') if len(x) > 30 else x
         )
@@ -476,7 +699,7 @@ with tab1:
     with col2:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         fig_discount_box = px.box(
-            filtered_df,
+            fetch_rows(['category', 'discount_percentage'], **filter_state),
             x='category',
             y='discount_percentage',
             title="📦 Discount Distribution by Category",
@@ -498,8 +721,6 @@ with tab2:
     with col1:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         # Correlation heatmap
-        numeric_cols = ['rating', 'discount_percentage', 'rating_count']
-        corr_matrix = filtered_df[numeric_cols].corr()
         
         fig_heatmap = px.imshow(
             corr_matrix,
@@ -515,20 +736,16 @@ with tab2:
     with col2:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         # Category performance radar chart
-        category_stats = filtered_df.groupby('category').agg({
-            'rating': 'mean',
-            'discount_percentage': 'mean',
-            'rating_count': 'mean'
-        }).head(8)
+        radar_stats = category_stats[['rating', 'discount_percentage', 'rating_count']].head(8)
         
         # Normalize the data for radar chart
         from sklearn.preprocessing import MinMaxScaler
         scaler = MinMaxScaler()
-        normalized_stats = scaler.fit_transform(category_stats)
+        normalized_stats = scaler.fit_transform(radar_stats)
         
         fig_radar = go.Figure()
         
-        for i, category in enumerate(category_stats.index):
+        for i, category in enumerate(radar_stats.index):
             fig_radar.add_trace(go.Scatterpolar(
                 r=normalized_stats[i],
                 theta=['Rating', 'Discount %', 'Review Count'],
@@ -551,14 +768,16 @@ with tab3:
     with col1:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         fig_hist_rating = px.histogram(
-            filtered_df,
+            cube.rating_distribution(cells),
             x='rating',
+            y='count',
+            histfunc='sum',
             nbins=25,
             title="📊 Rating Distribution",
             color_discrete_sequence=['#FF9500']
         )
         
-        mean_rating = filtered_df['rating'].mean()
+        mean_rating = kpis['avg_rating']
         fig_hist_rating.add_vline(
             x=mean_rating, 
             line_dash="dash", 
@@ -566,6 +785,7 @@ with tab3:
             annotation_text=f"Mean: {mean_rating:.2f}"
         )
         
+        fig_hist_rating.update_yaxes(title="Products")
         fig_hist_rating.update_layout(
             height=400,
             bargap=0.1,
@@ -578,16 +798,19 @@ with tab3:
     with col2:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         # Only show products with reviews > 0 for meaningful distribution
-        products_with_reviews = filtered_df[filtered_df['rating_count'] > 0]
+        products_with_reviews = cube.review_distribution(cells)
         
         fig_hist_reviews = px.histogram(
             products_with_reviews,
             x='rating_count',
+            y='count',
+            histfunc='sum',
             title="👥 Review Count Distribution",
             nbins=30,
             color_discrete_sequence=['#28a745']
         )
         fig_hist_reviews.update_xaxes(type="log", title="Review Count (Log Scale)")
+        fig_hist_reviews.update_yaxes(title="Products")
         fig_hist_reviews.update_layout(
             height=400,
             bargap=0.1,
@@ -596,34 +819,97 @@ with tab3:
         )
         st.plotly_chart(fig_hist_reviews, use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        fig_hist_price = px.histogram(
+            fetch_rows(['discounted_price'], **filter_state),
+            x='discounted_price',
+            nbins=40,
+            title="💰 Price Distribution",
+            color_discrete_sequence=['#17a2b8']
+        )
+        
+        # Reference lines come from the category sketches, so they only describe
+        # the histogram while the price range is not narrowed
+        if price_range is None and pd.notna(price_stats['median']):
+            fig_hist_price.add_vline(
+                x=price_stats['median'],
+                line_dash="dash",
+                line_color="red",
+                annotation_text=f"Category Median: ₹{price_stats['median']:,.0f}"
+            )
+            fig_hist_price.add_vline(
+                x=price_stats['p90'],
+                line_dash="dot",
+                line_color="purple",
+                annotation_text=f"Category P90: ₹{price_stats['p90']:,.0f}"
+            )
+        
+        fig_hist_price.update_xaxes(title="Discounted Price (₹)")
+        fig_hist_price.update_layout(
+            height=400,
+            bargap=0.1,
+            title_font_size=14,
+            margin=dict(t=40, b=20, l=20, r=20)
+        )
+        st.plotly_chart(fig_hist_price, use_container_width=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        category_sales = category_stats['total_sales'].nlargest(10).reset_index()
+        category_sales['category'] = category_sales['category'].str[:30]
+        
+        fig_sales = px.bar(
+            category_sales,
+            x='total_sales',
+            y='category',
+            orientation='h',
+            title="🧾 Top 10 Categories by Total Sales",
+            color='total_sales',
+            color_continuous_scale='Blues'
+        )
+        fig_sales.update_xaxes(title="Total Sales (₹)")
+        fig_sales.update_layout(
+            height=400,
+            yaxis={'categoryorder':'total ascending'},
+            title_font_size=14,
+            margin=dict(t=40, b=20, l=20, r=20)
+        )
+        st.plotly_chart(fig_sales, use_container_width=True)
+        st.markdown('</div>', unsafe_allow_html=True)
 
 with tab4:
     # Top products section with enhanced layout
     st.markdown("### 🏆 Top Performing Products")
     
     # Sort and get top products
-    top_products = filtered_df.sort_values(
-        by=sort_by, ascending=(sort_order == "Ascending")
-    ).head(items_to_show)
+    top_products = fetch_rows(
+        ['product_name', 'category', 'discounted_price', 'rating', 'discount_percentage', 'rating_count'],
+        order_by=sort_by, ascending=(sort_order == "Ascending"), limit=items_to_show, **filter_state
+    )
     
     # Enhanced metrics
     metrics_col1, metrics_col2, metrics_col3, metrics_col4 = st.columns(4)
     
     with metrics_col1:
-        best_rated = filtered_df.loc[filtered_df['rating'].idxmax()]
+        best_rated = fetch_rows(['rating'], order_by='rating', limit=1, **filter_state).iloc[0]
         st.metric("🥇 Best Rated", f"{best_rated['rating']:.1f}⭐", 
-                 delta=f"+{best_rated['rating'] - filtered_df['rating'].mean():.2f}")
+                 delta=f"+{best_rated['rating'] - kpis['avg_rating']:.2f}")
     
     with metrics_col2:
-        highest_discount = filtered_df.loc[filtered_df['discount_percentage'].idxmax()]
+        highest_discount = fetch_rows(['discount_percentage'], order_by='discount_percentage', limit=1, **filter_state).iloc[0]
         st.metric("💰 Best Discount", f"{highest_discount['discount_percentage']:.0f}%")
     
     with metrics_col3:
-        most_reviewed = filtered_df.loc[filtered_df['rating_count'].idxmax()]
+        most_reviewed = fetch_rows(['rating_count'], order_by='rating_count', limit=1, **filter_state).iloc[0]
         st.metric("👑 Most Reviewed", f"{int(most_reviewed['rating_count']):,}")
     
     with metrics_col4:
-        avg_price_category = filtered_df.groupby('category')['discount_percentage'].mean().idxmax()
+        avg_price_category = category_stats['discount_percentage'].idxmax()
         st.metric("🎯 Best Category", avg_price_category[:15])
     
     # Products display
@@ -633,18 +919,19 @@ with tab4:
         st.markdown("#### 📋 Detailed Products Table")
         
         # Enhanced dataframe display
-        display_df = top_products[['product_name', 'category', 'rating', 'discount_percentage', 'rating_count']].copy()
+        display_df = top_products[['product_name', 'category', 'discounted_price', 'rating', 'discount_percentage', 'rating_count']].copy()
         display_df['rating'] = display_df['rating'].round(2)
         display_df['discount_percentage'] = display_df['discount_percentage'].round(1)
         display_df['rating_count'] = display_df['rating_count'].astype(int)
-        display_df.columns = ['📦 Product Name', '🏷️ Category', '⭐ Rating', '💸 Discount %', '👥 Reviews']
+        display_df.columns = ['📦 Product Name', '🏷️ Category', '💰 Price', '⭐ Rating', '💸 Discount %', '👥 Reviews']
         
         # Style the dataframe
         styled_df = display_df.style.format({
+            '💰 Price': '₹{:,.0f}',
             '⭐ Rating': '{:.1f}',
             '💸 Discount %': '{:.1f}%',
             '👥 Reviews': '{:,}'
-        }).background_gradient(subset=['⭐ Rating'], cmap='RdYlGn', vmin=0, vmax=5)
+        }, na_rep='—').background_gradient(subset=['⭐ Rating'], cmap='RdYlGn', vmin=0, vmax=5)
         
         st.dataframe(styled_df, use_container_width=True, height=400)
     
@@ -674,11 +961,72 @@ with tab4:
         )
         st.plotly_chart(fig_top_chart, use_container_width=True)
 
+with tab5:
+    if not review_signals:
+        st.info("💡 No review signals in this snapshot. Re-run `python ingest.py` to extract them.")
+    else:
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+            flagged = aggregate_rows({s: (s, 'positive') for s in review_signals}, **filter_state).iloc[0].reset_index()
+            flagged.columns = ['signal', 'products']
+            flagged['signal'] = flagged['signal'].map(signal_label)
+            
+            fig_signals = px.bar(
+                flagged,
+                x='products',
+                y='signal',
+                orientation='h',
+                title="🚩 Products Flagged by Review Signal",
+                color='products',
+                color_continuous_scale='Reds',
+                text='products'
+            )
+            fig_signals.update_layout(
+                height=400,
+                yaxis={'categoryorder':'total ascending'},
+                title_font_size=14,
+                margin=dict(t=40, b=20, l=20, r=20)
+            )
+            st.plotly_chart(fig_signals, use_container_width=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+            signal_by_category = aggregate_rows({s: (s, 'sum') for s in review_signals}, by='category', **filter_state)
+            top_signal_categories = signal_by_category.sum(axis=1).nlargest(10).index
+            signal_by_category = signal_by_category.loc[top_signal_categories].reset_index().melt(
+                id_vars='category', var_name='signal', value_name='mentions'
+            )
+            signal_by_category['signal'] = signal_by_category['signal'].map(signal_label)
+            signal_by_category['category'] = signal_by_category['category'].str[:30]
+            
+            fig_signal_category = px.bar(
+                signal_by_category,
+                x='mentions',
+                y='category',
+                color='signal',
+                orientation='h',
+                title="📦 Signal Mentions by Category (Top 10)"
+            )
+            fig_signal_category.update_layout(
+                height=400,
+                yaxis={'categoryorder':'total ascending'},
+                title_font_size=14,
+                margin=dict(t=40, b=20, l=20, r=20)
+            )
+            st.plotly_chart(fig_signal_category, use_container_width=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+
 # Product Cards Section
 st.markdown('<div class="section-header">🛍️ Featured Products</div>', unsafe_allow_html=True)
 
 # Display top 6 products as cards
-top_featured = filtered_df.sort_values('rating', ascending=False).head(6)
+top_featured = fetch_rows(
+    ['product_name', 'category', 'rating', 'discount_percentage', 'rating_count'],
+    order_by='rating', limit=6, **filter_state
+)
 
 for i in range(0, len(top_featured), 3):
     cols = st.columns(3)
@@ -720,18 +1068,18 @@ with st.sidebar:
     st.markdown("---")
     st.markdown("### 💡 Quick Insights")
     
-    if not filtered_df.empty:
+    if not cells.empty:
         # Calculate insights
-        total_categories = len(filtered_df['category'].unique())
-        avg_reviews_per_product = filtered_df['rating_count'].mean()
-        high_rated_products = len(filtered_df[filtered_df['rating'] >= 4.0])
+        total_categories = len(category_stats)
+        avg_reviews_per_product = kpis['total_reviews'] / kpis['total_products']
+        high_rated_products = cube.high_rated_count(cells)
         
         st.info(f"📊 **{total_categories}** unique categories")
         st.info(f"👥 **{avg_reviews_per_product:.0f}** avg reviews per product")
         st.info(f"⭐ **{high_rated_products}** products rated 4.0+")
         
         # Top category by average rating
-        top_category = filtered_df.groupby('category')['rating'].mean().idxmax()
+        top_category = category_stats['rating'].idxmax()
         st.success(f"🏆 **{top_category}** has the highest average rating")
     
     st.markdown("---")
@@ -755,11 +1103,12 @@ if st.checkbox("🔍 Show Data Quality Report", value=False):
     with col1:
         st.markdown("#### 📊 Completeness")
         completeness = {
-            'Product Name': (df['product_name'].notna().sum() / len(df)) * 100,
-            'Category': (df['category'].notna().sum() / len(df)) * 100,
-            'Rating': (df['rating'].notna().sum() / len(df)) * 100,
-            'Discount': (df['discount_percentage'].notna().sum() / len(df)) * 100,
-            'Review Count': (df['rating_count'].notna().sum() / len(df)) * 100
+            'Product Name': summary['completeness']['product_name'],
+            'Category': summary['completeness']['category'],
+            'Price': summary['completeness']['discounted_price'],
+            'Rating': summary['completeness']['rating'],
+            'Discount': summary['completeness']['discount_percentage'],
+            'Review Count': summary['completeness']['rating_count']
         }
         
         for field, percentage in completeness.items():
@@ -768,26 +1117,27 @@ if st.checkbox("🔍 Show Data Quality Report", value=False):
     
     with col2:
         st.markdown("#### 📈 Distribution Stats")
-        st.write(f"**Total Records:** {len(df):,}")
-        st.write(f"**Filtered Records:** {len(filtered_df):,}")
-        st.write(f"**Categories:** {df['category'].nunique()}")
-        st.write(f"**Rating Range:** {df['rating'].min():.1f} - {df['rating'].max():.1f}")
-        st.write(f"**Discount Range:** {df['discount_percentage'].min():.1f}% - {df['discount_percentage'].max():.1f}%")
+        st.write(f"**Total Records:** {summary['rows']:,}")
+        st.write(f"**Filtered Records:** {kpis['total_products']:,}")
+        st.write(f"**Categories:** {len(summary['categories'])}")
+        st.write(f"**Rating Range:** {summary['rating_min']:.1f} - {summary['rating_max']:.1f}")
+        st.write(f"**Discount Range:** {summary['discount_min']:.1f}% - {summary['discount_max']:.1f}%")
+        st.write(f"**Price Range:** ₹{summary['price_min']:,.0f} - ₹{summary['price_max']:,.0f}")
     
     with col3:
         st.markdown("#### ⚠️ Data Issues")
         issues = []
         
         # Check for potential issues
-        zero_discounts = len(df[df['discount_percentage'] == 0])
-        if zero_discounts > len(df) * 0.1:
+        zero_discounts = summary['zero_discounts']
+        if zero_discounts > summary['rows'] * 0.1:
             issues.append(f"🟡 {zero_discounts:,} products with 0% discount")
         
-        no_reviews = len(df[df['rating_count'] == 0])
+        no_reviews = summary['no_reviews']
         if no_reviews > 0:
             issues.append(f"🟡 {no_reviews:,} products without reviews")
         
-        extreme_discounts = len(df[df['discount_percentage'] > 80])
+        extreme_discounts = summary['extreme_discounts']
         if extreme_discounts > 0:
             issues.append(f"🟡 {extreme_discounts:,} products with >80% discount")
         
@@ -798,13 +1148,13 @@ if st.checkbox("🔍 Show Data Quality Report", value=False):
                 st.warning(issue)
 
 # Performance optimization notice
-if len(filtered_df) > 5000:
+if kpis['total_products'] > 5000:
     st.info("💡 **Performance Note:** Large dataset detected. Some visualizations show a sample of data for optimal performance.")
 
 # Last updated info
 st.markdown(f"""
 <div style='text-align: center; color: #6c757d; font-size: 0.8rem; margin-top: 1rem;'>
     Last updated: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')} | 
-    Showing {len(filtered_df):,} of {len(df):,} products
+    Showing {kpis['total_products']:,} of {summary['rows']:,} products
 </div>
 """, unsafe_allow_html=True)
\ No newline at end of file
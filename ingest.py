@@ -0,0 +1,199 @@
+"""Ingestion step for the Amazon Analytics Hub.
+
+Cleans the raw ``amazon.csv`` export, extracts review-text signals, builds
+per-category sketches and the aggregate cube, and writes a snapshot the
+dashboard loads instead of the CSV. The review text itself is dropped from
+the snapshot, so it never reaches the Streamlit worker.
+
+Usage:
+    python ingest.py [--csv amazon.csv] [--out snapshot] [--keywords signals.json] [--jobs N] [--exact-distinct]
+                     [--reuse-settings]
+"""
+import argparse
+import hashlib
+import json
+import os
+from functools import partial
+
+import pandas as pd
+
+from cube import build_cube, build_price_cube
+from sketches import HyperLogLog, KLLSketch, build_category_sketches
+from text_signals import SIGNAL_KEYWORDS, extract_signals
+
+CSV_PATH = "amazon.csv"
+SNAPSHOT_DIR = "snapshot"
+CATALOG_FILE = "catalog.pkl"
+PARQUET_FILE = "catalog.parquet"
+SKETCHES_FILE = "sketches.pkl"
+CUBE_FILE = "cube.pkl"
+PRICE_CUBE_FILE = "price_cube.pkl"
+MANIFEST_FILE = "manifest.json"
+# Bumped whenever the snapshot layout or cleaning changes, so older snapshots get rebuilt
+SNAPSHOT_FORMAT = 4
+TEXT_COLUMNS = ['review_content', 'review_title']
+PRICE_COLUMNS = ['discounted_price', 'actual_price']
+
+
+def clean_catalog(df):
+    df.columns = df.columns.str.strip()
+    df['rating'] = pd.to_numeric(df['rating'], errors='coerce')
+    df = df.dropna(subset=['rating'])
+    df['discount_percentage'] = df['discount_percentage'].astype(str).str.replace('%', '', regex=False)
+    df['discount_percentage'] = pd.to_numeric(df['discount_percentage'], errors='coerce')
+    df['rating_count'] = pd.to_numeric(df['rating_count'], errors='coerce')
+    df['rating_count'] = df['rating_count'].fillna(0)
+    for col in PRICE_COLUMNS:
+        df[col] = df[col].astype(str).str.replace('₹', '', regex=False).str.replace(',', '', regex=False).str.strip()
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df['price_diff'] = df['actual_price'] - df['discounted_price']
+    df['category'] = df['category'].astype(str)
+    df['product_name'] = df['product_name'].astype(str)
+    return df.reset_index(drop=True)
+
+
+def _source_stat(csv_path):
+    stat = os.stat(csv_path)
+    return {'source': os.path.abspath(csv_path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def _fingerprint(csv_path, keywords, exact_distinct):
+    # Identifies one dataset generation: the raw bytes plus the settings that shape the snapshot
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    digest.update(json.dumps([SNAPSHOT_FORMAT, keywords, exact_distinct], sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def build_snapshot(csv_path=CSV_PATH, out_dir=SNAPSHOT_DIR, keywords=None, n_jobs=None, exact_distinct=False,
+                   keywords_path=None):
+    keywords = keywords or SIGNAL_KEYWORDS
+    df = clean_catalog(pd.read_csv(csv_path))
+
+    signals = extract_signals(df, TEXT_COLUMNS, keywords=keywords, n_jobs=n_jobs)
+    df = pd.concat([df.drop(columns=TEXT_COLUMNS, errors='ignore'), signals], axis=1)
+
+    os.makedirs(out_dir, exist_ok=True)
+    df.to_pickle(os.path.join(out_dir, CATALOG_FILE))
+    # Columnar copy for the DuckDB query backend; row_id is the row's position in the snapshot
+    df.rename_axis('row_id').reset_index().to_parquet(os.path.join(out_dir, PARQUET_FILE), index=False)
+    distinct = partial(HyperLogLog, exact=exact_distinct)
+    # user_id holds a comma-joined list of the reviewers behind each row
+    reviewers = df[['category']].assign(user_id=df['user_id'].astype(str).str.split(',')).explode('user_id')
+    sketches = {
+        'price': build_category_sketches(df, 'discounted_price', KLLSketch),
+        'products': build_category_sketches(df, 'product_id', distinct),
+        'reviewers': build_category_sketches(reviewers, 'user_id', distinct),
+        'distinct_exact': exact_distinct,
+    }
+    pd.to_pickle(sketches, os.path.join(out_dir, SKETCHES_FILE))
+    build_cube(df).to_pickle(os.path.join(out_dir, CUBE_FILE))
+    build_price_cube(df).to_pickle(os.path.join(out_dir, PRICE_CUBE_FILE))
+    manifest = dict(
+        _source_stat(csv_path),
+        fingerprint=_fingerprint(csv_path, keywords, exact_distinct),
+        format=SNAPSHOT_FORMAT,
+        rows=len(df),
+        keywords=keywords,
+        # Recorded so a rebuild after a CSV change keeps the operator's settings
+        keywords_path=keywords_path and os.path.abspath(keywords_path),
+        exact_distinct=exact_distinct,
+    )
+    with open(os.path.join(out_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return df
+
+
+def snapshot_is_stale(csv_path=CSV_PATH, out_dir=SNAPSHOT_DIR):
+    """True when the snapshot is missing, has an older layout, was built from
+    a different CSV or its keyword dictionary no longer matches the configured one."""
+    for name in (CATALOG_FILE, PARQUET_FILE, SKETCHES_FILE, CUBE_FILE, PRICE_CUBE_FILE, MANIFEST_FILE):
+        if not os.path.exists(os.path.join(out_dir, name)):
+            return True
+    if not os.path.exists(csv_path):
+        return False
+    manifest = load_manifest(out_dir)
+    current = _source_stat(csv_path)
+    if manifest.get('format') != SNAPSHOT_FORMAT:
+        return True
+    if any(manifest.get(key) != value for key, value in current.items()):
+        return True
+    return manifest.get('keywords') != snapshot_settings(manifest)['keywords']
+
+
+def load_keywords(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def snapshot_settings(manifest):
+    """Settings to rebuild a snapshot with, taken from its manifest.
+
+    A keywords file recorded at build time is re-read, so edits to it are
+    picked up; without one the built-in dictionary applies.
+    """
+    keywords_path = manifest.get('keywords_path')
+    if keywords_path and os.path.exists(keywords_path):
+        keywords = load_keywords(keywords_path)
+    elif keywords_path:
+        keywords = manifest['keywords']
+    else:
+        keywords = SIGNAL_KEYWORDS
+    return {
+        'keywords': keywords,
+        'keywords_path': keywords_path,
+        'exact_distinct': manifest.get('exact_distinct', False),
+    }
+
+
+def load_manifest(out_dir=SNAPSHOT_DIR):
+    with open(os.path.join(out_dir, MANIFEST_FILE), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_snapshot(out_dir=SNAPSHOT_DIR):
+    return pd.read_pickle(os.path.join(out_dir, CATALOG_FILE))
+
+
+def load_sketches(out_dir=SNAPSHOT_DIR):
+    return pd.read_pickle(os.path.join(out_dir, SKETCHES_FILE))
+
+
+def load_cube(out_dir=SNAPSHOT_DIR):
+    return pd.read_pickle(os.path.join(out_dir, CUBE_FILE))
+
+
+def load_price_cube(out_dir=SNAPSHOT_DIR):
+    return pd.read_pickle(os.path.join(out_dir, PRICE_CUBE_FILE))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the dashboard snapshot from the raw CSV export.")
+    parser.add_argument('--csv', default=CSV_PATH, help="raw Amazon CSV export")
+    parser.add_argument('--out', default=SNAPSHOT_DIR, help="snapshot output directory")
+    parser.add_argument('--keywords', help="JSON file mapping signal name to a list of keywords")
+    parser.add_argument('--jobs', type=int, default=None, help="worker processes for signal extraction")
+    parser.add_argument('--exact-distinct', action='store_true',
+                        help="store exact sets instead of HyperLogLog sketches for distinct counts")
+    parser.add_argument('--reuse-settings', action='store_true',
+                        help="take the keywords and distinct-count mode from the existing snapshot's manifest")
+    args = parser.parse_args()
+    if args.reuse_settings and (args.keywords or args.exact_distinct):
+        parser.error("--reuse-settings cannot be combined with --keywords or --exact-distinct")
+
+    keywords_path, exact_distinct = args.keywords, args.exact_distinct
+    keywords = load_keywords(keywords_path) if keywords_path else None
+    if args.reuse_settings and os.path.exists(os.path.join(args.out, MANIFEST_FILE)):
+        settings = snapshot_settings(load_manifest(args.out))
+        keywords, keywords_path = settings['keywords'], settings['keywords_path']
+        exact_distinct = settings['exact_distinct']
+
+    df = build_snapshot(args.csv, args.out, keywords=keywords, n_jobs=args.jobs, exact_distinct=exact_distinct,
+                        keywords_path=keywords_path)
+    print(f"✅ Snapshot written to {args.out} ({len(df):,} products)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""Concurrent-session load test for the dashboard.
+
+Builds a synthetic catalog, starts one ``streamlit run dashboard.py`` server
+on it and drives N scripted websocket clients against that single worker,
+the way N analysts in browsers would. The clients speak Streamlit's own
+protocol: each rerun sends a ``BackMsg`` with the session's widget states and
+waits for the server's ``script_finished`` message.
+
+Widget states are serialised by Streamlit's ``AppTest``, run once in this
+process before the server starts, so widget ids and value encodings always
+match the installed Streamlit version.
+
+Usage:
+    python loadtest.py [--sessions 1 4 8 16] [--products 10000] [--actions 40] [--seed 0]
+
+A warm-up session runs before the first level and every client makes an
+untimed first run, so the snapshot load and cache prewarm stay out of the
+timings. Reports p50/p95/p99 rerun latency, reruns per second and memory per
+session: the server's resident memory growth (from ``/proc/<pid>/statm``)
+between before the clients connect and after they finish, divided by N.
+All clients share one event loop in this process; at high N, check that the
+client process is not itself the bottleneck.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import pandas as pd
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from streamlit.testing.v1 import AppTest
+from tornado.websocket import websocket_connect
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, REPO_DIR)
+
+import ingest  # noqa: E402
+from text_signals import SIGNAL_KEYWORDS  # noqa: E402
+
+DASHBOARD = os.path.join(REPO_DIR, "dashboard.py")
+
+WORDS = ['usb', 'cable', 'charger', 'wireless', 'earbuds', 'smart', 'watch', 'led', 'tv', 'mixer',
+         'grinder', 'kettle', 'mouse', 'keyboard', 'hdmi', 'adapter', 'power', 'bank', 'fan', 'iron']
+REVIEW_SNIPPETS = ['good product', 'value for money', 'works fine', 'nice quality'] + [
+    keyword for keywords in SIGNAL_KEYWORDS.values() for keyword in keywords
+]
+
+
+def synthetic_catalog(n_products, seed=0):
+    """A catalog shaped like ``amazon.csv``, including its string formatting quirks."""
+    rng = random.Random(seed)
+    categories = [
+        f"{top}|{sub}" for top in ['Electronics', 'Computers', 'Home&Kitchen', 'OfficeProducts', 'Toys']
+        for sub in ['Accessories', 'Cables', 'Audio', 'Appliances', 'Storage', 'Lighting', 'Power', 'Misc']
+    ]
+    rows = []
+    for i in range(n_products):
+        actual = round(rng.lognormvariate(7, 1.2), 0)
+        discount = rng.randint(0, 90)
+        reviewers = [f"U{rng.randrange(n_products * 4):X}" for _ in range(rng.randint(1, 8))]
+        rows.append({
+            'product_id': f"B{rng.randrange(int(n_products * 0.9) + 1):09d}",
+            'product_name': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 8))).title(),
+            'category': rng.choice(categories),
+            'discounted_price': f"₹{actual * (100 - discount) / 100:,.0f}",
+            'actual_price': f"₹{actual:,.0f}",
+            'discount_percentage': f"{discount}%",
+            'rating': round(min(5.0, max(1.0, rng.gauss(4.1, 0.4))), 1),
+            'rating_count': int(rng.paretovariate(1.2) * 10),
+            'about_product': 'Synthetic product',
+            'user_id': ','.join(reviewers),
+            'user_name': ','.join(reviewers),
+            'review_id': ','.join(f"R{rng.getrandbits(32):X}" for _ in reviewers),
+            'review_title': ','.join(rng.choice(REVIEW_SNIPPETS) for _ in reviewers),
+            'review_content': ','.join(rng.choice(REVIEW_SNIPPETS) for _ in reviewers),
+            'img_link': '',
+            'product_link': '',
+        })
+    return pd.DataFrame(rows)
+
+
+def make_trace(n_actions, rng):
+    """A random interaction trace; each action is one or more reruns."""
+    trace = []
+    while len(trace) < n_actions:
+        kind = rng.choice(['discount_drag', 'reviews_drag', 'search', 'tab', 'download', 'sort'])
+        # Drags pass through the bucket edges the sliders snap to
+        if kind == 'discount_drag':
+            end = rng.randrange(0, 15)
+            trace += [('slider', "💸 Minimum Discount %", float(end * step // 4 * 5)) for step in range(1, 5)]
+        elif kind == 'reviews_drag':
+            end = rng.randrange(1, 9)
+            trace += [('select_slider', "👥 Minimum Reviews", 2 ** (end * step // 4) - 1) for step in range(1, 5)]
+        elif kind == 'search':
+            word = rng.choice(WORDS + [''])
+            trace += [('text_input', "Search products...", word[:i]) for i in range(1, len(word) + 1)] or [
+                ('text_input', "Search products...", '')
+            ]
+        elif kind == 'sort':
+            trace.append(('selectbox', "📈 Sort by", rng.choice(["rating", "discount_percentage", "rating_count"])))
+        else:
+            # Tabs render server-side on every run and download clicks only trigger
+            # a plain rerun, so both replay as an unchanged rerun
+            trace.append(('rerun', kind, None))
+    return trace[:n_actions]
+
+
+def _widget(at, kind, label):
+    return next(w for w in getattr(at, kind) if w.label == label)
+
+
+def _check(at, action):
+    if at.exception:
+        raise RuntimeError(f"Dashboard raised during {action}: {at.exception[0].value}")
+
+
+def widget_steps(traces, timeout):
+    """Turn traces into per-rerun widget states, or None for a plain rerun."""
+    at = AppTest.from_file(DASHBOARD, default_timeout=timeout)
+    at.run()
+    _check(at, 'initial run')
+    steps = []
+    for trace in traces:
+        session = []
+        for kind, label, value in trace:
+            if kind == 'rerun':
+                session.append(None)
+                continue
+            widget = _widget(at, kind, label)
+            widget.set_value(value)
+            state = WidgetState()
+            state.CopyFrom(widget._widget_state)
+            session.append(state)
+        steps.append(session)
+    return steps
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, timeout):
+    server = subprocess.Popen([
+        sys.executable, '-m', 'streamlit', 'run', DASHBOARD,
+        '--server.headless', 'true', '--server.port', str(port), '--server.address', '127.0.0.1',
+        '--browser.gatherUsageStats', 'false',
+    ], stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"streamlit exited with status {server.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.25)
+    server.terminate()
+    raise RuntimeError("streamlit server did not become healthy in time")
+
+
+def _rss_mb(pid):
+    """Current resident memory of a process, or None where /proc is unavailable."""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+class Session:
+    """One browser tab: a websocket to the server plus its current widget states."""
+
+    def __init__(self, conn, timeout):
+        self.conn = conn
+        self.timeout = timeout
+        self.widgets = {}
+
+    @classmethod
+    async def open(cls, url, timeout):
+        conn = await websocket_connect(url, max_message_size=1024 * 1024 * 1024)
+        return cls(conn, timeout)
+
+    async def rerun(self, state=None):
+        if state is not None:
+            self.widgets[state.id] = state
+        msg = BackMsg()
+        msg.rerun_script.widget_states.widgets.extend(self.widgets.values())
+        await self.conn.write_message(msg.SerializeToString(), binary=True)
+        return await asyncio.wait_for(self._until_finished(), self.timeout)
+
+    async def _until_finished(self):
+        widget_ids = set()
+        while True:
+            data = await self.conn.read_message()
+            if data is None:
+                raise RuntimeError("Server closed the session")
+            msg = ForwardMsg()
+            msg.ParseFromString(data)
+            kind = msg.WhichOneof('type')
+            if kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                element = msg.delta.new_element
+                element_type = element.WhichOneof('type')
+                if element_type == 'exception':
+                    raise RuntimeError(f"Dashboard raised: {element.exception.message}")
+                widget_id = getattr(getattr(element, element_type), 'id', '')
+                if widget_id:
+                    widget_ids.add(widget_id)
+            elif kind == 'script_finished':
+                if msg.script_finished != ForwardMsg.FINISHED_SUCCESSFULLY:
+                    raise RuntimeError(f"Script run ended with status {msg.script_finished}")
+                return widget_ids
+
+    def close(self):
+        self.conn.close()
+
+
+async def open_session(url, steps, timeout):
+    """Connect and make the untimed first run, checking the trace's widgets exist."""
+    session = await Session.open(url, timeout)
+    widget_ids = await session.rerun()
+    missing = {state.id for state in steps if state is not None} - widget_ids
+    if missing:
+        session.close()
+        raise RuntimeError(f"Server rendered no widgets with ids {sorted(missing)}")
+    return session
+
+
+async def replay(session, steps):
+    latencies = []
+    for state in steps:
+        start = time.perf_counter()
+        await session.rerun(state)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _percentile(values, pct):
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+
+async def run_level(url, server_pid, steps, timeout):
+    n_sessions = len(steps)
+    rss_before = _rss_mb(server_pid)
+    sessions = await asyncio.gather(*(open_session(url, session_steps, timeout) for session_steps in steps))
+    try:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(replay(s, session_steps) for s, session_steps in zip(sessions, steps)))
+        wall = time.perf_counter() - start
+        # Measured while every session is still connected and holding its state
+        rss_after = _rss_mb(server_pid)
+    finally:
+        for session in sessions:
+            session.close()
+
+    latencies = [latency for session in results for latency in session]
+    return {
+        'sessions': n_sessions,
+        'reruns': len(latencies),
+        'p50_ms': _percentile(latencies, 50) * 1000,
+        'p95_ms': _percentile(latencies, 95) * 1000,
+        'p99_ms': _percentile(latencies, 99) * 1000,
+        'reruns_per_s': len(latencies) / wall,
+        'mb_per_session': None if rss_before is None else (rss_after - rss_before) / n_sessions,
+    }
+
+
+async def warm_up(url, timeout):
+    """One untimed session so the first level doesn't absorb the snapshot load and prewarm."""
+    session = await open_session(url, [], timeout)
+    session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay concurrent interaction traces against dashboard.py.")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 4, 8, 16], help="concurrency levels to test")
+    parser.add_argument('--products', type=int, default=10000, help="synthetic catalog size")
+    parser.add_argument('--actions', type=int, default=40, help="reruns per session trace")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=60, help="seconds allowed per rerun")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = os.path.join(workdir, ingest.CSV_PATH)
+        synthetic_catalog(args.products, args.seed).to_csv(csv_path, index=False)
+        # The dashboard resolves amazon.csv and the snapshot relative to the working directory
+        os.chdir(workdir)
+        server = None
+        try:
+            ingest.build_snapshot(csv_path)
+            print(f"🛒 Synthetic catalog: {args.products:,} products in {workdir}")
+            traces = {
+                n: [make_trace(args.actions, random.Random(args.seed * 1000 + n * 100 + i)) for i in range(n)]
+                for n in args.sessions
+            }
+            flat = iter(widget_steps([trace for level in traces.values() for trace in level], args.timeout))
+            steps = {n: [next(flat) for _ in range(n)] for n in traces}
+
+            port = _free_port()
+            server = start_server(port, args.timeout)
+            url = f"ws://127.0.0.1:{port}/_stcore/stream"
+            asyncio.run(warm_up(url, args.timeout))
+
+            print(f"{'sessions':>8} {'reruns':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'reruns/s':>9} {'MB/session':>11}")
+            for n_sessions in args.sessions:
+                r = asyncio.run(run_level(url, server.pid, steps[n_sessions], args.timeout))
+                memory = 'n/a' if r['mb_per_session'] is None else f"{r['mb_per_session']:.1f}"
+                print(f"{r['sessions']:>8} {r['reruns']:>7} {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} "
+                      f"{r['p99_ms']:>8.0f} {r['reruns_per_s']:>9.1f} {memory:>11}")
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+            os.chdir(REPO_DIR)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Disk-backed result cache that survives restarts.
+
+Results are pickled into a SQLite file under a key made of the cache
+format version, the dataset fingerprint, a namespace and the canonical filter
+state, so neither a rebuilt snapshot nor a deploy that bumps the version
+serves results computed the old way. The file is bounded in size and evicts
+least-recently-used entries. Every filter state seen is also counted, so the
+most popular states can be pre-warmed after a restart.
+"""
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+
+# Bump whenever the code producing a cached result changes shape or meaning;
+# entries written under another version are never read and age out via LRU
+CACHE_VERSION = 3
+
+
+def canonical_state(state):
+    """Order-insensitive, JSON-serialisable form of a filter state dict."""
+    canonical = {}
+    for name, value in state.items():
+        if isinstance(value, (list, set)):
+            value = sorted(value)
+        elif isinstance(value, tuple):
+            value = list(value)
+        if isinstance(value, float):
+            value = round(value, 6)
+        canonical[name] = value
+    return canonical
+
+
+def make_key(fingerprint, namespace, state):
+    payload = json.dumps([CACHE_VERSION, fingerprint, namespace, canonical_state(state)], sort_keys=True, default=float)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, path, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Streamlit serves sessions from several threads; the lock serialises access
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS usage ("
+            "fingerprint TEXT NOT NULL, state TEXT NOT NULL, hits INTEGER NOT NULL, "
+            "PRIMARY KEY (fingerprint, state))"
+        )
+        # Running estimate of the stored size, so eviction doesn't sum the table on every put
+        self._approx_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+        return pickle.loads(row[0])
+
+    def put(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            replaced = self._conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            self._approx_bytes += len(blob) - (replaced[0] if replaced else 0)
+            if self._approx_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Other worker processes may share the file, so recount before trusting the estimate
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total > self.max_bytes:
+            for key, size in self._conn.execute("SELECT key, size FROM results ORDER BY last_used").fetchall():
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        self._approx_bytes = total
+
+    def get_or_compute(self, fingerprint, namespace, state, compute):
+        key = make_key(fingerprint, namespace, state)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def record_usage(self, fingerprint, state):
+        state_json = json.dumps(canonical_state(state), sort_keys=True, default=float)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO usage (fingerprint, state, hits) VALUES (?, ?, 1) "
+                "ON CONFLICT (fingerprint, state) DO UPDATE SET hits = hits + 1",
+                (fingerprint, state_json),
+            )
+
+    def popular_states(self, limit=10, fingerprint=None):
+        """Most frequently used filter states, optionally for one dataset only."""
+        query = "SELECT state, SUM(hits) AS total FROM usage"
+        params = ()
+        if fingerprint is not None:
+            query += " WHERE fingerprint = ?"
+            params = (fingerprint,)
+        query += " GROUP BY state ORDER BY total DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, params + (limit,)).fetchall()
+        return [json.loads(state) for state, _ in rows]
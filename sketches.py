@@ -0,0 +1,174 @@
+"""Mergeable summary sketches built at ingestion.
+
+Sketches are built per category and merged for whatever categories the user
+selects, so the dashboard never has to sort or scan the raw column to answer
+a quantile question.
+"""
+import hashlib
+import math
+import random
+
+
+class KLLSketch:
+    """KLL quantile sketch (Karnin, Lang & Liberty).
+
+    Keeps a stack of compactors; level ``h`` holds items of weight ``2**h``.
+    When a level overflows it is sorted and every other item is promoted, so
+    memory stays around ``3 * k`` items regardless of the stream length.
+    """
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._levels = [[]]
+        self._rng = random.Random(seed)
+
+    def _capacity(self, level):
+        depth = len(self._levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _size(self):
+        return sum(len(items) for items in self._levels)
+
+    def _compress(self):
+        while self._size() > sum(self._capacity(h) for h in range(len(self._levels))):
+            for h, items in enumerate(self._levels):
+                if len(items) >= self._capacity(h):
+                    if h + 1 == len(self._levels):
+                        self._levels.append([])
+                    items.sort()
+                    # An odd item out stays behind so the promoted weight is exact
+                    keep = [items.pop()] if len(items) % 2 else []
+                    offset = self._rng.randint(0, 1)
+                    self._levels[h + 1].extend(items[offset::2])
+                    self._levels[h] = keep
+                    break
+
+    def update(self, values):
+        for value in values:
+            value = float(value)
+            if math.isnan(value):
+                continue
+            self._levels[0].append(value)
+            self.n += 1
+            self.min = min(self.min, value)
+            self.max = max(self.max, value)
+            if len(self._levels[0]) >= self._capacity(0):
+                self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self._levels) < len(other._levels):
+            self._levels.append([])
+        for h, items in enumerate(other._levels):
+            self._levels[h].extend(items)
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        """Approximate values at each rank fraction in ``qs`` (0 = min, 1 = max)."""
+        if self.n == 0:
+            return [math.nan for _ in qs]
+        weighted = sorted(
+            (value, 2 ** h) for h, items in enumerate(self._levels) for value in items
+        )
+        total = sum(weight for _, weight in weighted)
+        results = []
+        for q in qs:
+            if q <= 0:
+                results.append(self.min)
+                continue
+            if q >= 1:
+                results.append(self.max)
+                continue
+            target = q * total
+            cumulative = 0
+            for value, weight in weighted:
+                cumulative += weight
+                if cumulative >= target:
+                    results.append(value)
+                    break
+        return results
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+
+class HyperLogLog:
+    """HyperLogLog distinct-count sketch (Flajolet et al.).
+
+    Uses ``2**p`` one-byte registers, so memory is fixed at 4 KiB for the
+    default ``p=12`` with a standard error of about 1.6%. With ``exact=True``
+    the raw values are kept in a set instead, which is useful for checking
+    the estimate against the true count.
+    """
+
+    def __init__(self, p=12, exact=False):
+        self.p = p
+        self.m = 1 << p
+        self.exact = exact
+        self._registers = bytearray(self.m)
+        self._values = set() if exact else None
+
+    def update(self, values):
+        width = 64 - self.p
+        for value in values:
+            if value is None or (isinstance(value, float) and math.isnan(value)):
+                continue
+            value = str(value).strip()
+            if not value:
+                continue
+            if self.exact:
+                self._values.add(value)
+                continue
+            digest = hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest()
+            hashed = int.from_bytes(digest, 'big')
+            index = hashed >> width
+            rank = width - (hashed & ((1 << width) - 1)).bit_length() + 1
+            if rank > self._registers[index]:
+                self._registers[index] = rank
+        return self
+
+    def merge(self, other):
+        if (self.p, self.exact) != (other.p, other.exact):
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision or mode")
+        if self.exact:
+            self._values |= other._values
+        else:
+            self._registers = bytearray(map(max, self._registers, other._registers))
+        return self
+
+    def cardinality(self):
+        if self.exact:
+            return len(self._values)
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / sum(2.0 ** -r for r in self._registers)
+        zeros = self._registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            # Linear counting is more accurate while many registers are still empty
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+    def relative_error(self):
+        return 0.0 if self.exact else 1.04 / math.sqrt(self.m)
+
+
+def merge_sketches(sketches, empty):
+    """Merge an iterable of sketches into a fresh copy made by ``empty()``."""
+    merged = empty()
+    for sketch in sketches:
+        merged.merge(sketch)
+    return merged
+
+
+def build_category_sketches(df, column, empty):
+    """One sketch of ``column`` per category, filled via ``update``."""
+    return {
+        category: empty().update(values.to_numpy())
+        for category, values in df.groupby('category')[column]
+    }
@@ -0,0 +1,36 @@
+import pytest
+
+pytest.importorskip('pandas')
+pytest.importorskip('duckdb')
+pytest.importorskip('pyarrow')
+pytest.importorskip('streamlit')
+
+import backends  # noqa: E402
+import ingest  # noqa: E402
+from loadtest import synthetic_catalog  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def snapshot_dir(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp('snapshot')
+    catalog = synthetic_catalog(3000, seed=1)
+    # Products without a parsable price stay in the catalog and must filter the same way
+    catalog.loc[::97, 'discounted_price'] = ''
+    csv_path = workdir / ingest.CSV_PATH
+    catalog.to_csv(csv_path, index=False)
+    out_dir = workdir / ingest.SNAPSHOT_DIR
+    ingest.build_snapshot(str(csv_path), str(out_dir), n_jobs=1)
+    return str(out_dir)
+
+
+@pytest.mark.parametrize('name', backends.BACKENDS[1:])
+def test_backend_matches_pandas(snapshot_dir, name):
+    reference = backends.open_backend('pandas', snapshot_dir)
+    candidate = backends.open_backend(name, snapshot_dir)
+
+    assert backends.check_parity(reference, candidate) == []
+
+
+def test_open_backend_rejects_unknown_name(snapshot_dir):
+    with pytest.raises(ValueError):
+        backends.open_backend('sqlite', snapshot_dir)
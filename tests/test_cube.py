@@ -0,0 +1,92 @@
+import itertools
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+import cube  # noqa: E402
+from backends import PandasBackend  # noqa: E402
+
+CATEGORIES = [f"Top|Sub{i}" for i in range(6)]
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    rng = np.random.default_rng(0)
+    n = 5000
+    actual = np.round(rng.lognormal(7, 1.2, n))
+    discount = rng.integers(0, 91, n).astype(float)
+    discount[::53] = np.nan
+    price = np.round(actual * (100 - np.nan_to_num(discount)) / 100)
+    price[::41] = np.nan
+    return pd.DataFrame({
+        'product_name': [f"product {i}" for i in range(n)],
+        'category': rng.choice(CATEGORIES, n),
+        'rating': np.round(np.clip(rng.normal(4.1, 0.4, n), 1, 5), 1),
+        'discount_percentage': discount,
+        'rating_count': np.floor(rng.pareto(1.2, n) * 10),
+        'discounted_price': price,
+        'price_diff': actual - price,
+    })
+
+
+@pytest.fixture(scope='module')
+def backend(catalog):
+    return PandasBackend(catalog)
+
+
+def states(aligned):
+    ratings = [(1.0, 5.0), (4.0, 4.5), (4.3, 5.0)]
+    discounts = [0.0, 25.0, 60.0] if aligned else [12.5, 33.0]
+    reviews = [0, 7, 63] if aligned else [10, 50]
+    prices = [None, (100.0, 1000.0), (0.0, 50.0)] if aligned else [(120.0, 990.0)]
+    categories = [CATEGORIES, CATEGORIES[:2]]
+    for cats, (low, high), discount, min_reviews, price_range in itertools.product(
+            categories, ratings, discounts, reviews, prices):
+        yield dict(categories=cats, min_rating=low, max_rating=high, price_range=price_range,
+                   search_term='', min_discount=discount, min_reviews=min_reviews, signals=[])
+
+
+def sliced(catalog, state):
+    rollup = cube.build_price_cube(catalog) if state['price_range'] else cube.build_cube(catalog)
+    return cube.slice_cube(rollup, state['categories'], state['min_rating'], state['max_rating'],
+                           state['price_range'], state['min_discount'], state['min_reviews'])
+
+
+def assert_same_aggregates(cells, rows):
+    expected = cube.build_cube(rows)
+    assert cube.totals(cells) == pytest.approx(cube.totals(expected), rel=1e-9, nan_ok=True)
+    pd.testing.assert_frame_equal(cube.by_category(cells).sort_index(), cube.by_category(expected).sort_index(),
+                                  check_dtype=False, rtol=1e-9)
+    assert cube.high_rated_count(cells) == cube.high_rated_count(expected)
+    pd.testing.assert_frame_equal(cube.rating_distribution(cells), cube.rating_distribution(expected),
+                                  check_dtype=False)
+
+
+@pytest.mark.parametrize('aligned', [True, False])
+def test_slice_matches_filtered_rows(catalog, backend, aligned):
+    answered = 0
+    for state in states(aligned):
+        cells = sliced(catalog, state)
+        if cells is None:
+            continue
+        answered += 1
+        assert_same_aggregates(cells, catalog.loc[backend.filter_ids(state)])
+    if aligned:
+        assert answered
+
+
+def test_slider_aligned_states_hit_the_cube(catalog):
+    # The sliders snap to bucket edges; a price range with a discount floor is the only combination
+    # the cubes can't answer
+    for state in states(aligned=True):
+        if state['price_range'] and state['min_discount']:
+            continue
+        assert sliced(catalog, state) is not None, state
+
+
+def test_edges():
+    assert cube.review_edges(0) == [0]
+    assert cube.review_edges(100) == [0, 1, 3, 7, 15, 31, 63]
+    assert cube.price_edges(130, 4100) == [100.0, 200.0, 500.0, 1000.0, 2000.0, 5000.0]
@@ -0,0 +1,96 @@
+import itertools
+
+import pytest
+
+import result_cache
+from result_cache import ResultCache, make_key
+
+STATE = dict(categories=['b', 'a'], min_rating=4.0, price_range=(10.0, 200.0), search_term='', signals=[])
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # A strictly increasing clock, so LRU order never depends on timer resolution
+    ticks = itertools.count(1)
+
+    class FakeTime:
+        @staticmethod
+        def time():
+            return float(next(ticks))
+
+    monkeypatch.setattr(result_cache, 'time', FakeTime)
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return ResultCache(str(tmp_path / 'results.sqlite'), max_bytes=1000)
+
+
+def test_round_trip_survives_reopen(tmp_path):
+    path = str(tmp_path / 'results.sqlite')
+    ResultCache(path).put('key', {'total_products': 3})
+
+    assert ResultCache(path).get('key') == {'total_products': 3}
+    assert ResultCache(path).get('missing') is None
+
+
+def test_evicts_least_recently_used_over_limit(cache):
+    cache.put('a', b'x' * 400)
+    cache.put('b', b'x' * 400)
+    cache.get('a')
+    cache.put('c', b'x' * 400)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+
+
+def test_replacing_an_entry_does_not_count_twice(cache):
+    for _ in range(5):
+        cache.put('a', b'x' * 400)
+    cache.put('b', b'x' * 400)
+
+    assert cache.get('a') is not None
+    assert cache.get('b') is not None
+
+
+def test_skips_values_larger_than_the_cache(cache):
+    cache.put('huge', b'x' * 2000)
+
+    assert cache.get('huge') is None
+
+
+def test_key_ignores_list_order():
+    reordered = dict(STATE, categories=['a', 'b'])
+    assert make_key('fp', 'kpis', STATE) == make_key('fp', 'kpis', reordered)
+
+
+def test_fingerprint_namespace_and_version_change_the_key(cache, monkeypatch):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_compute('fp1', 'kpis', STATE, compute) == 1
+    assert cache.get_or_compute('fp1', 'kpis', STATE, compute) == 1
+    assert cache.get_or_compute('fp2', 'kpis', STATE, compute) == 2
+    assert cache.get_or_compute('fp1', 'figures', STATE, compute) == 3
+
+    monkeypatch.setattr(result_cache, 'CACHE_VERSION', result_cache.CACHE_VERSION + 1)
+    assert cache.get_or_compute('fp1', 'kpis', STATE, compute) == 4
+
+
+def test_popular_states_are_ordered_by_use(cache):
+    rare = dict(STATE, min_rating=3.0)
+    common = dict(STATE, min_rating=4.5)
+    for state, hits in [(rare, 1), (STATE, 2), (common, 3)]:
+        for _ in range(hits):
+            cache.record_usage('fp1', state)
+    for _ in range(5):
+        cache.record_usage('fp2', rare)
+
+    assert [s['min_rating'] for s in cache.popular_states(fingerprint='fp1')] == [4.5, 4.0, 3.0]
+    assert [s['min_rating'] for s in cache.popular_states(limit=2, fingerprint='fp1')] == [4.5, 4.0]
+    assert cache.popular_states(limit=1)[0]['min_rating'] == 3.0
+    assert cache.popular_states(fingerprint='fp2')[0]['categories'] == ['a', 'b']
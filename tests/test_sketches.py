@@ -0,0 +1,112 @@
+import bisect
+import math
+import random
+from functools import partial
+
+import pytest
+
+from sketches import HyperLogLog, KLLSketch, merge_sketches
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+# Comfortably above the rank error of the default k=200
+RANK_TOLERANCE = 0.02
+
+
+def synthetic_ids(n, seed=0):
+    rng = random.Random(seed)
+    return [f"U{rng.getrandbits(48):012X}" for _ in range(n)]
+
+
+def synthetic_prices(n, seed=0):
+    rng = random.Random(seed)
+    return [round(rng.lognormvariate(6, 1.3), 0) for _ in range(n)]
+
+
+def rank_errors(sketch, values):
+    ordered = sorted(values)
+    errors = []
+    for q, estimate in zip(QUANTILES, sketch.quantiles(QUANTILES)):
+        # Ties make a range of ranks correct; measure the distance to that range
+        low = bisect.bisect_left(ordered, estimate) / len(ordered)
+        high = bisect.bisect_right(ordered, estimate) / len(ordered)
+        errors.append(max(low - q, q - high, 0))
+    return errors
+
+
+@pytest.mark.parametrize('n', [100, 5000, 100000])
+def test_kll_quantiles_within_rank_error(n):
+    values = synthetic_prices(n, seed=n)
+    sketch = KLLSketch().update(values)
+
+    assert sketch.n == n
+    assert max(rank_errors(sketch, values)) <= RANK_TOLERANCE
+    assert sketch.quantiles([0, 1]) == [min(values), max(values)]
+
+
+def test_kll_merged_category_sketches_match_union():
+    rng = random.Random(3)
+    categories = {f"cat{c}": synthetic_prices(rng.randint(500, 20000), seed=c) for c in range(8)}
+    sketches = {name: KLLSketch(seed=i).update(values) for i, (name, values) in enumerate(categories.items())}
+    selected = ['cat1', 'cat4', 'cat5', 'cat6']
+
+    merged = merge_sketches((sketches[c] for c in selected), KLLSketch)
+    union = [value for c in selected for value in categories[c]]
+
+    assert merged.n == len(union)
+    assert max(rank_errors(merged, union)) <= RANK_TOLERANCE
+
+
+def test_kll_skips_missing_values_and_handles_empty():
+    sketch = KLLSketch().update([float('nan'), 3.0, float('nan'), 1.0, 2.0])
+    assert sketch.n == 3
+    assert sketch.quantile(0.5) == 2.0
+    assert all(math.isnan(value) for value in KLLSketch().quantiles([0, 0.5, 1]))
+
+
+@pytest.mark.parametrize('n', [50, 1000, 20000, 200000])
+def test_cardinality_within_error_bound(n):
+    ids = synthetic_ids(n, seed=n)
+    hll = HyperLogLog().update(ids)
+    exact = HyperLogLog(exact=True).update(ids)
+
+    assert exact.cardinality() == len(set(ids))
+    assert abs(hll.cardinality() - exact.cardinality()) <= 3 * hll.relative_error() * exact.cardinality()
+
+
+def test_duplicates_and_blanks_are_ignored():
+    ids = synthetic_ids(5000)
+    hll = HyperLogLog().update(ids + ids[:2500] + ['', ' ', None, float('nan')])
+    exact = HyperLogLog(exact=True).update(ids + ids[:2500] + ['', ' ', None, float('nan')])
+
+    assert exact.cardinality() == 5000
+    assert abs(hll.cardinality() - 5000) <= 3 * hll.relative_error() * 5000
+
+
+@pytest.mark.parametrize('exact', [False, True])
+def test_merged_category_sketches_match_union(exact):
+    # Reviewers overlap across categories, so the merged count must not double count them
+    rng = random.Random(7)
+    ids = synthetic_ids(50000, seed=7)
+    categories = {f"cat{c}": [] for c in range(8)}
+    for value in ids:
+        for category in rng.sample(sorted(categories), rng.randint(1, 3)):
+            categories[category].append(value)
+
+    sketches = {name: HyperLogLog(exact=exact).update(values) for name, values in categories.items()}
+    selected = ['cat0', 'cat2', 'cat3', 'cat7']
+    merged = merge_sketches((sketches[c] for c in selected), partial(HyperLogLog, exact=exact))
+    truth = len({value for c in selected for value in categories[c]})
+
+    assert abs(merged.cardinality() - truth) <= 3 * merged.relative_error() * truth
+    if exact:
+        assert merged.cardinality() == truth
+
+
+def test_merge_rejects_mismatched_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(p=12).merge(HyperLogLog(p=10))
+
+
+def test_merge_rejects_mismatched_mode():
+    with pytest.raises(ValueError):
+        HyperLogLog(exact=True).merge(HyperLogLog())
@@ -0,0 +1,58 @@
+import pytest
+
+pytest.importorskip('pandas')
+
+import pandas as pd  # noqa: E402
+
+from text_signals import SIGNAL_KEYWORDS, KeywordAutomaton, extract_signals, signal_column  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def automaton():
+    return KeywordAutomaton(SIGNAL_KEYWORDS)
+
+
+def hits(automaton, text):
+    return dict(zip(automaton.signals, automaton.count(text)))
+
+
+@pytest.mark.parametrize('text', ["replacement", "Replacement!", "got a replacement."])
+def test_overlapping_keywords_count_once(automaton, text):
+    assert hits(automaton, text)['refund'] == 1
+
+
+@pytest.mark.parametrize('text, signal', [
+    ("unbroken seal", 'broken'),
+    ("irreplaceable", 'refund'),
+    ("nonrefundable", 'refund'),
+    ("unfaked", 'fake'),
+])
+def test_keywords_must_start_a_word(automaton, text, signal):
+    assert hits(automaton, text)[signal] == 0
+
+
+def test_repeated_phrases_count_separately(automaton):
+    counts = hits(automaton, "fake, fake and counterfeit. Not working; stopped working")
+    assert counts['fake'] == 3
+    assert counts['broken'] == 2
+
+
+def test_signals_are_counted_independently(automaton):
+    counts = hits(automaton, "Poor quality, asked for a refund and a replacement")
+    assert counts == {'refund': 2, 'broken': 0, 'fake': 0, 'late_delivery': 0, 'poor_quality': 1}
+
+
+def test_parallel_extraction_matches_serial():
+    snippets = ["good product", "replacement came broken", "fake", "poor quality, refund please",
+                "delivered late and damaged", "irreplaceable", None]
+    df = pd.DataFrame({
+        'review_title': [snippets[i % len(snippets)] for i in range(500)],
+        'review_content': [snippets[(i * 3) % len(snippets)] for i in range(500)],
+    })
+
+    serial = extract_signals(df, ['review_title', 'review_content'], n_jobs=1)
+    parallel = extract_signals(df, ['review_title', 'review_content'], n_jobs=3, chunk_size=37)
+
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert list(serial.columns) == [signal_column(name) for name in SIGNAL_KEYWORDS]
+    assert serial.loc[1, signal_column('broken')] == 1
@@ -0,0 +1,142 @@
+"""Keyword signals extracted from review text.
+
+Every keyword of every signal is compiled into one Aho-Corasick automaton, so
+each review is scanned once no matter how many keywords are configured. The
+result is one small integer column per signal holding the number of keyword
+hits for that product; overlapping keywords of one signal count once.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Default keyword dictionary: signal name -> phrases that count towards it
+SIGNAL_KEYWORDS = {
+    'refund': ['refund', 'return', 'replace', 'replacement', 'money back'],
+    'broken': ['broken', 'damaged', 'defective', 'stopped working', 'not working', 'dead on arrival'],
+    'fake': ['fake', 'duplicate', 'counterfeit', 'not original', 'not genuine'],
+    'late_delivery': ['late delivery', 'delivered late', 'delivery was late', 'delayed delivery', 'delivery delayed'],
+    'poor_quality': ['poor quality', 'bad quality', 'cheap quality', 'waste of money'],
+}
+
+SIGNAL_PREFIX = 'signal_'
+
+
+def signal_column(name):
+    return SIGNAL_PREFIX + name
+
+
+def signal_label(column):
+    return column[len(SIGNAL_PREFIX):].replace('_', ' ').title()
+
+
+def signal_columns(df):
+    return [c for c in df.columns if c.startswith(SIGNAL_PREFIX)]
+
+
+class KeywordAutomaton:
+    """Aho-Corasick matcher counting keyword hits per signal."""
+
+    def __init__(self, keywords):
+        self.signals = list(keywords)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for idx, name in enumerate(self.signals):
+            for word in keywords[name]:
+                self._add(word.lower(), idx)
+        self._link()
+
+    def _add(self, word, idx):
+        state = 0
+        for ch in word:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((idx, len(word)))
+
+    def _link(self):
+        # Breadth-first so every fail target is resolved before its dependants
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def count(self, text):
+        counts = [0] * len(self.signals)
+        # Span of the last hit counted per signal, so overlapping keywords count once
+        spans = [(-1, -1)] * len(self.signals)
+        goto, fail, out = self._goto, self._fail, self._out
+        text = text.lower()
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            # Outputs are longest first, so the longest hit ending here wins
+            for idx, length in out[state]:
+                # Only count hits starting on a word boundary ("unbroken" is not "broken")
+                start = pos - length + 1
+                if start and text[start - 1].isalnum():
+                    continue
+                last_start, last_end = spans[idx]
+                if start > last_end:
+                    counts[idx] += 1
+                    spans[idx] = (start, pos)
+                elif start <= last_start:
+                    # A longer keyword covering the counted one ("replace" -> "replacement")
+                    spans[idx] = (start, pos)
+        return counts
+
+
+_automaton = None
+
+
+def _init_worker(keywords):
+    global _automaton
+    _automaton = KeywordAutomaton(keywords)
+
+
+def _count_chunk(texts):
+    return [_automaton.count(text) for text in texts]
+
+
+def extract_signals(df, columns, keywords=None, n_jobs=None, chunk_size=2000):
+    """Count keyword hits per signal over the given text columns of ``df``.
+
+    Rows are split into chunks and scanned on ``n_jobs`` worker processes
+    (all cores by default). Returns a frame indexed like ``df`` with one
+    downcast unsigned integer column per signal.
+    """
+    keywords = keywords or SIGNAL_KEYWORDS
+    present = [c for c in columns if c in df.columns]
+    if present:
+        texts = df[present].fillna('').astype(str).agg('\n'.join, axis=1).tolist()
+    else:
+        texts = [''] * len(df)
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1 or len(chunks) <= 1:
+        _init_worker(keywords)
+        rows = [row for chunk in chunks for row in _count_chunk(chunk)]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(keywords,)) as pool:
+            rows = [row for part in pool.map(_count_chunk, chunks) for row in part]
+
+    counts = np.array(rows, dtype=np.int64).reshape(len(texts), len(keywords))
+    signals = pd.DataFrame(counts, columns=[signal_column(name) for name in keywords], index=df.index)
+    return signals.apply(pd.to_numeric, downcast='unsigned')